@@ -0,0 +1,29 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.core.config import settings
+from app.services.orchestrator import intel, ml
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+@router.post("/reputation/reload")
+def reload_reputation(force: bool = False):
+    """Re-read changed blocklist files in this worker (all of them with
+    `force`). Other workers pick changes up on their next poll."""
+    reloaded = intel.reputation.reload(force=force)
+    return {"reloaded": reloaded, **intel.reputation.stats()}
+
+@router.post("/models/reload")
+def reload_models():
+    """Load the manifest's current models in this worker, validate them on
+    the smoke set and swap them in. Other workers pick changes up on their
+    next poll."""
+    return {"reloaded": ml.reload(), "versions": ml.versions()}
@@ -2,18 +2,21 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
-from app.schemas.email import AnalyzeEmailRequest
-from app.schemas.common import AnalyzeResponse
-from app.services.orchestrator import analyze_text_payload
+from app.schemas.email import AnalyzeEmailRequest, AnalyzeEmailBatchRequest
+from app.schemas.common import AnalyzeResponse, AnalyzeBatchResponse
+from app.services.context import email_raw_text
+from app.services.orchestrator import analyze_text_payload, analyze_text_batch_payload
 
 router = APIRouter()
 
+def _email_text(payload: AnalyzeEmailRequest) -> str:
+    return email_raw_text(payload.subject, payload.sender, payload.headers_raw, payload.body)
+
 @router.post("/analyze-email", response_model=AnalyzeResponse)
 def analyze_email(payload: AnalyzeEmailRequest, db: Session = Depends(get_db)):
-    text = "\n".join([
-        f"Subject: {payload.subject or ''}",
-        f"From: {payload.sender or ''}",
-        payload.headers_raw or "",
-        payload.body
-    ]).strip()
-    return analyze_text_payload(db=db, kind="email", raw_text=text, user_visible_text=payload.body)
+    return analyze_text_payload(db=db, kind="email", raw_text=_email_text(payload), user_visible_text=payload.body)
+
+@router.post("/analyze-batch/email", response_model=AnalyzeBatchResponse)
+def analyze_email_batch(payload: AnalyzeEmailBatchRequest, db: Session = Depends(get_db)):
+    items = [(_email_text(i), i.body) for i in payload.items]
+    return {"results": analyze_text_batch_payload(db=db, kind="email", items=items)}
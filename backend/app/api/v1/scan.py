@@ -0,0 +1,168 @@
+import json
+from typing import AsyncIterator, List, Literal, Tuple
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+from app.api.v1.email import _email_text
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.logging import logger
+from app.schemas.email import AnalyzeEmailRequest
+from app.schemas.sms import AnalyzeSMSRequest
+from app.schemas.url import AnalyzeURLRequest
+from app.services.orchestrator import analyze_text_batch_payload, analyze_url_batch_payload
+
+router = APIRouter()
+
+SCHEMAS = {"sms": AnalyzeSMSRequest, "email": AnalyzeEmailRequest, "url": AnalyzeURLRequest}
+
+class _UploadStreamingResponse(StreamingResponse):
+    """StreamingResponse that leaves `receive` to the body iterator.
+
+    Starlette's version listens for disconnects on `receive` while it
+    streams, which would swallow the request body we are still reading;
+    here a disconnect surfaces as ClientDisconnect from request.stream().
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """(line number, line) for each non-blank line. Lines longer than
+    SCAN_MAX_LINE_BYTES are yielded as b"" without being buffered."""
+    limit = settings.scan_max_line_bytes
+    buf = b""
+    line_no = 0
+    oversized = False
+    async for chunk in chunks:
+        lines = (buf + chunk).split(b"\n")
+        buf = lines.pop()
+        for line in lines:
+            line_no += 1
+            if oversized:
+                oversized = False
+                yield line_no, b""
+            elif len(line) > limit:
+                yield line_no, b""
+            elif line.strip():
+                yield line_no, line
+        if len(buf) > limit:
+            oversized, buf = True, b""
+    if oversized or buf.strip():
+        yield line_no + 1, b"" if oversized or len(buf) > limit else buf
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8") + b"\n"
+
+def _error(ex: ValueError) -> str:
+    if isinstance(ex, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'record'}: {e['msg']}" for e in ex.errors())
+    return f"invalid JSON: {ex}"
+
+def _run(db, kind: str, batch: list, persist: bool) -> List[dict]:
+    if kind == "url":
+        return analyze_url_batch_payload(db, [p.url for p in batch], persist=persist)
+    if kind == "email":
+        items = [(_email_text(p), p.body) for p in batch]
+        return analyze_text_batch_payload(db, "email", items, persist=persist)
+    items = [(p.text.strip(), p.text.strip()) for p in batch]
+    return analyze_text_batch_payload(db, "sms", items, persist=persist)
+
+def _run_each(db, kind: str, batch: list, persist: bool) -> List[dict]:
+    """Fallback when a micro-batch fails: analyze record by record, turning
+    the ones that still fail into {"error": ...} results."""
+    results = []
+    for payload in batch:
+        try:
+            results.append(_run(db, kind, [payload], persist)[0])
+        except Exception as ex:
+            db.rollback()
+            logger.warning(f"Bulk {kind} scan: record failed: {ex!r}")
+            results.append({"error": f"analysis failed: {ex}"})
+    return results
+
+def _analyze(db, kind: str, pending: List[tuple], persist: bool) -> Tuple[bytes, int]:
+    """Run one micro-batch through the batch pipeline and render it, in
+    input order, as NDJSON. `pending` holds (line, id, payload) entries and
+    (line, None, error dict) entries for lines that failed to parse. Also
+    returns how many parsed records failed in analysis."""
+    batch = [p for _, _, p in pending if not isinstance(p, dict)]
+    results = []
+    if batch:
+        try:
+            results = _run(db, kind, batch, persist)
+        except Exception as ex:
+            db.rollback()
+            logger.warning(f"Bulk {kind} scan: batch of {len(batch)} failed ({ex!r}); retrying record by record.")
+            results = _run_each(db, kind, batch, persist)
+    failed = sum(1 for r in results if "error" in r)
+    results = iter(results)
+    out = []
+    for line_no, record_id, payload in pending:
+        if isinstance(payload, dict):
+            out.append(_dumps({"line": line_no, **payload}))
+            continue
+        head = {"line": line_no} if record_id is None else {"line": line_no, "id": record_id}
+        out.append(_dumps({**head, **next(results)}))
+    return b"".join(out), failed
+
+def _flush(db, kind: str, pending: List[tuple], persist: bool, counts: dict) -> bytes:
+    body, failed = _analyze(db, kind, pending, persist)
+    counts["records"] -= failed
+    counts["errors"] += failed
+    return body
+
+async def _scan(request: Request, kind: str, persist: bool) -> AsyncIterator[bytes]:
+    schema = SCHEMAS[kind]
+    batch_size = settings.scan_batch_size
+    counts = {"records": 0, "errors": 0}
+    db = SessionLocal()
+    try:
+        pending: List[tuple] = []
+        async for line_no, line in _lines(request.stream()):
+            if not line:
+                counts["errors"] += 1
+                pending.append((line_no, None, {"error": f"line longer than {settings.scan_max_line_bytes} bytes"}))
+            else:
+                try:
+                    record = json.loads(line)
+                    payload = schema.model_validate(record)
+                    pending.append((line_no, record.get("id"), payload))
+                    counts["records"] += 1
+                except ValueError as ex:
+                    counts["errors"] += 1
+                    pending.append((line_no, None, {"error": _error(ex)}))
+            if len(pending) >= batch_size:
+                # The next line isn't read until these verdicts are sent, so
+                # a slow reader or a slow pipeline throttles the upload.
+                yield await run_in_threadpool(_flush, db, kind, pending, persist, counts)
+                pending = []
+        if pending:
+            yield await run_in_threadpool(_flush, db, kind, pending, persist, counts)
+        yield _dumps({"summary": counts})
+    except ClientDisconnect:
+        logger.info(f"Bulk {kind} scan aborted by client after line {counts['records'] + counts['errors']}.")
+    except Exception as ex:
+        # Say so in-band: the 200 status has already been sent.
+        logger.exception(f"Bulk {kind} scan failed after line {counts['records'] + counts['errors']}.")
+        yield _dumps({"summary": {**counts, "aborted": f"{type(ex).__name__}: {ex}"}})
+    finally:
+        db.close()
+
+@router.post(
+    "/scan/{kind}",
+    response_class=_UploadStreamingResponse,
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/x-ndjson": {"schema": {"type": "string", "format": "binary"}}},
+    }},
+)
+async def scan(kind: Literal["sms", "email", "url"], request: Request, persist: bool = True):
+    """Analyze an NDJSON upload, one request body of the matching
+    /analyze-{kind} endpoint per line, and stream one verdict per line back
+    as it goes. See the README for the output format."""
+    return _UploadStreamingResponse(_scan(request, kind, persist), media_type="application/x-ndjson")
@@ -2,9 +2,9 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
-from app.schemas.sms import AnalyzeSMSRequest
-from app.schemas.common import AnalyzeResponse
-from app.services.orchestrator import analyze_text_payload
+from app.schemas.sms import AnalyzeSMSRequest, AnalyzeSMSBatchRequest
+from app.schemas.common import AnalyzeResponse, AnalyzeBatchResponse
+from app.services.orchestrator import analyze_text_payload, analyze_text_batch_payload
 
 router = APIRouter()
 
@@ -12,3 +12,9 @@ router = APIRouter()
 def analyze_sms(payload: AnalyzeSMSRequest, db: Session = Depends(get_db)):
     text = payload.text.strip()
     return analyze_text_payload(db=db, kind="sms", raw_text=text, user_visible_text=text)
+
+@router.post("/analyze-batch/sms", response_model=AnalyzeBatchResponse)
+def analyze_sms_batch(payload: AnalyzeSMSBatchRequest, db: Session = Depends(get_db)):
+    texts = [i.text.strip() for i in payload.items]
+    items = [(t, t) for t in texts]
+    return {"results": analyze_text_batch_payload(db=db, kind="sms", items=items)}
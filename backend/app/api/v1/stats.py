@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from app.core.config import settings
 from app.core.db import get_db
 from app.models.analysis import Analysis
+from app.services.orchestrator import cache
+from app.services.rollups import read_counters, timeseries
+from app.utils.lru import TTLCache
 
 router = APIRouter()
 
+MAX_TIMESERIES_HOURS = {"hour": 24 * 31, "day": 24 * 366, "week": 24 * 366 * 3, "month": 24 * 366 * 10}
+
+_response_cache = TTLCache(maxsize=1, ttl_seconds=settings.stats_cache_ttl_seconds)
+
 @router.get("/stats")
 def get_stats(db: Session = Depends(get_db)):
-    total = db.query(func.count(Analysis.id)).scalar() or 0
-    by_type = dict(db.query(Analysis.type, func.count(Analysis.id)).group_by(Analysis.type).all())
-    by_level = dict(db.query(Analysis.risk_level, func.count(Analysis.id)).group_by(Analysis.risk_level).all())
+    if settings.stats_cache_ttl_seconds > 0:
+        cached = _response_cache.get("stats")
+        if cached is not None:
+            return cached
+
+    counters = read_counters(db)
 
     recent = (
         db.query(Analysis)
@@ -19,10 +32,10 @@ def get_stats(db: Session = Depends(get_db)):
         .all()
     )
 
-    return {
-        "total": total,
-        "by_type": by_type,
-        "by_level": by_level,
+    result = {
+        "total": counters["total"].get("", 0),
+        "by_type": counters["type"],
+        "by_level": counters["level"],
         "recent": [
             {
                 "id": a.id,
@@ -35,3 +48,40 @@ def get_stats(db: Session = Depends(get_db)):
             for a in recent
         ]
     }
+    if settings.stats_cache_ttl_seconds > 0:
+        _response_cache.set("stats", result)
+    return result
+
+@router.get("/stats/timeseries")
+def get_stats_timeseries(
+    interval: Literal["hour", "day", "week", "month"] = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    type: Optional[str] = None,
+    level: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Counts and mean risk score per bucket, type and risk level (UTC).
+    Defaults to the last 30 days."""
+    end = _utc(end) if end else datetime.utcnow()
+    start = _utc(start) if start else end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if end - start > timedelta(hours=MAX_TIMESERIES_HOURS[interval]):
+        raise HTTPException(status_code=400, detail=f"Range too long for interval={interval}; use a coarser interval.")
+    return {
+        "interval": interval,
+        "start": start.isoformat() + "Z",
+        "end": end.isoformat() + "Z",
+        "series": timeseries(db, start, end, interval=interval, kind=type, level=level),
+    }
+
+def _utc(ts: datetime) -> datetime:
+    # Buckets are stored as naive UTC.
+    if ts.tzinfo is not None:
+        ts = (ts - ts.utcoffset()).replace(tzinfo=None)
+    return ts
+
+@router.get("/stats/cache")
+def get_cache_stats():
+    return cache.stats()
@@ -2,12 +2,16 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
-from app.schemas.url import AnalyzeURLRequest
-from app.schemas.common import AnalyzeResponse
-from app.services.orchestrator import analyze_url_payload
+from app.schemas.url import AnalyzeURLRequest, AnalyzeURLBatchRequest
+from app.schemas.common import AnalyzeResponse, AnalyzeBatchResponse
+from app.services.orchestrator import analyze_url_payload, analyze_url_batch_payload
 
 router = APIRouter()
 
 @router.post("/analyze-url", response_model=AnalyzeResponse)
 def analyze_url(payload: AnalyzeURLRequest, db: Session = Depends(get_db)):
     return analyze_url_payload(db=db, url=payload.url)
+
+@router.post("/analyze-batch/url", response_model=AnalyzeBatchResponse)
+def analyze_url_batch(payload: AnalyzeURLBatchRequest, db: Session = Depends(get_db)):
+    return {"results": analyze_url_batch_payload(db=db, urls=[i.url for i in payload.items])}
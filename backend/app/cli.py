@@ -0,0 +1,129 @@
+"""Maintenance commands.
+
+    python -m app.cli migrate-signals [--chunk-size N] [--delete-legacy]
+    python -m app.cli rebuild-stats
+    python -m app.cli update-psl <file-or-url>
+    python -m app.cli register-model <text|url> <artifact.joblib> --version <version>
+    python -m app.cli scan <sms|email|url> <input.csv|.parquet> <output.csv|.parquet|.ndjson> [--no-rdap]
+"""
+import argparse
+
+from app.core.config import settings
+from app.core.db import SessionLocal, init_db
+
+def _migrate_signals(args) -> None:
+    from app.services.migrations import delete_migrated_legacy_signals, migrate_signals
+
+    db = SessionLocal()
+    try:
+        n = migrate_signals(
+            db,
+            chunk_size=args.chunk_size,
+            delete_legacy=args.delete_legacy,
+            pause_seconds=args.pause_ms / 1000,
+            limit=args.limit,
+        )
+        print(f"Converted {n} analyses.")
+        if args.delete_legacy:
+            print(f"Deleted {delete_migrated_legacy_signals(db, chunk_size=args.chunk_size)} leftover legacy rows.")
+    finally:
+        db.close()
+
+def _rebuild_stats(args) -> None:
+    from app.services.rollups import read_counters, rebuild_counters, rebuild_hourly
+
+    db = SessionLocal()
+    try:
+        rebuild_counters(db)
+        rebuild_hourly(db)
+        db.commit()
+        print(f"Rebuilt stats counters: {read_counters(db)['total'].get('', 0)} analyses.")
+    finally:
+        db.close()
+
+def _update_psl(args) -> None:
+    from app.utils.psl import update_snapshot
+
+    rules = update_snapshot(args.source, args.path)
+    print(f"Wrote {rules} public suffix rules to {args.path or settings.psl_path}.")
+
+def _register_model(args) -> None:
+    import joblib
+    from app.services.ml_inference import validate_model
+    from app.services.model_registry import register
+
+    accuracy = validate_model(args.kind, joblib.load(args.artifact))
+    entry = register(args.kind, args.artifact, args.version, args.manifest)
+    print(f"Registered {args.kind} model {entry.version} at {entry.path} (smoke accuracy {accuracy:.2f}).")
+
+def _scan(args) -> None:
+    import sys
+    import time
+    from app.services.scanner import scan
+
+    start = time.perf_counter()
+
+    def progress(rows: int) -> None:
+        elapsed = time.perf_counter() - start
+        print(f"\r{rows} rows, {rows / max(elapsed, 1e-9):.0f} rows/s", end="", file=sys.stderr, flush=True)
+
+    try:
+        levels = scan(
+            args.kind, args.input, args.output,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            id_column=args.id_column,
+            network=not args.no_rdap,
+            progress=progress,
+        )
+    finally:
+        print(file=sys.stderr)
+    rows = sum(levels.values())
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} rows/s): "
+          + ", ".join(f"{level} {n}" for level, n in sorted(levels.items())))
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("migrate-signals", help="Move key/value analysis_signals rows into analyses.signals.")
+    p.add_argument("--chunk-size", type=int, default=1000)
+    p.add_argument("--pause-ms", type=float, default=0.0, help="Sleep between chunks to limit load.")
+    p.add_argument("--limit", type=int, default=None, help="Stop after this many analyses.")
+    p.add_argument("--delete-legacy", action="store_true", help="Delete legacy rows once converted.")
+    p.set_defaults(func=_migrate_signals)
+
+    p = sub.add_parser("rebuild-stats", help="Recompute the stats counters and hourly buckets from the analyses table.")
+    p.set_defaults(func=_rebuild_stats)
+
+    p = sub.add_parser("update-psl", help="Replace the bundled public suffix list snapshot.")
+    p.add_argument("source", help="public_suffix_list.dat file, or an https URL when egress is available")
+    p.add_argument("--path", default=None, help="Target file (default: PSL_PATH).")
+    p.set_defaults(func=_update_psl, needs_db=False)
+
+    p = sub.add_parser("register-model", help="Add a model artifact to the registry and make it current.")
+    p.add_argument("kind", choices=["text", "url"])
+    p.add_argument("artifact", help="joblib file written by ml.train_text / ml.train_url")
+    p.add_argument("--version", required=True, help="e.g. text-v2; reported as model_version")
+    p.add_argument("--manifest", default=None, help="Manifest to update (default: MODEL_MANIFEST_PATH).")
+    p.set_defaults(func=_register_model, needs_db=False)
+
+    p = sub.add_parser("scan", help="Score a CSV/Parquet archive offline (no database or Redis).")
+    p.add_argument("kind", choices=["sms", "email", "url"])
+    p.add_argument("input", help="CSV or Parquet with a text (sms), body (email) or url column")
+    p.add_argument("output", help="Verdicts, one row per input row: .csv, .parquet or .ndjson")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    p.add_argument("--chunk-size", type=int, default=2000, help="Rows per work unit.")
+    p.add_argument("--id-column", default=None, help="Input column copied to the output.")
+    p.add_argument("--no-rdap", action="store_true", help="Skip RDAP domain-age lookups (no network).")
+    p.set_defaults(func=_scan, needs_db=False)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "needs_db", True):
+        init_db()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
@@ -25,4 +25,22 @@ def get_db():
 def init_db():
     from app.models.base import Base
     from app.models.analysis import Analysis, AnalysisSignal  # noqa: F401
+    from app.models.stats import StatsCounter, StatsHourly  # noqa: F401
     Base.metadata.create_all(bind=engine)
+    _ensure_columns(Base.metadata)
+
+def _ensure_columns(metadata):
+    """Add columns introduced after a table was created. create_all() only
+    creates missing tables; new nullable columns without a default are a
+    metadata-only change on Postgres, so this doesn't rewrite the table."""
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                ddl_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl_type}'))
@@ -0,0 +1,91 @@
+"""Prometheus metrics, served at /metrics.
+
+Stage timings are per call: a single /analyze-* request observes each stage
+once for one input, a batch or bulk-scan call once for the whole batch. With
+several uvicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty directory
+shared by the workers so /metrics aggregates all of them.
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+# 0.5 ms .. 10 s: model and rule stages sit at the bottom, RDAP and database
+# commits at the top.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ANALYSIS_SECONDS = Histogram(
+    "scamshield_analysis_seconds",
+    "Time to analyze one request's inputs, end to end.",
+    ["kind"],
+    buckets=BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "scamshield_stage_seconds",
+    "Time spent in one analysis stage: cache, rules, ml, rdap, intel, risk, explain, db_flush, db_commit.",
+    ["kind", "stage"],
+    buckets=BUCKETS,
+)
+VERDICTS = Counter(
+    "scamshield_verdicts_total",
+    "Verdicts returned, by risk level and the model version that scored them.",
+    ["kind", "risk_level", "model_version"],
+)
+CACHE_LOOKUPS = Counter(
+    "scamshield_cache_lookups_total",
+    "Cache reads by tier (local, redis) and result (hit, miss).",
+    ["tier", "result"],
+)
+RDAP_LOOKUPS = Counter(
+    "scamshield_rdap_lookups_total",
+    "RDAP lookups by result: found, no_date (not found or no registration event) or failed.",
+    ["result"],
+)
+REDIS_BREAKER_STATE = Gauge(
+    "scamshield_redis_breaker_state",
+    "Redis circuit breaker state: 0 closed, 1 half-open (probing), 2 open.",
+    multiprocess_mode="liveall",
+)
+REDIS_BREAKER_TRIPS = Counter(
+    "scamshield_redis_breaker_trips_total",
+    "Times the Redis circuit breaker opened.",
+)
+MODEL_INFO = Gauge(
+    "scamshield_model_info",
+    "1 for the model version each kind currently serves.",
+    ["kind", "version"],
+    multiprocess_mode="livemax",
+)
+
+@contextmanager
+def stage(kind: str, name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(kind, name).observe(time.perf_counter() - start)
+
+def set_model_version(kind: str, version: str, previous: Optional[str] = None) -> None:
+    if previous is not None and previous != version:
+        MODEL_INFO.labels(kind, previous).set(0)
+    MODEL_INFO.labels(kind, version).set(1)
+
+def render() -> tuple:
+    """(body, content type) for /metrics."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -1,8 +1,13 @@
+import threading
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 
+from app.core import metrics
 from app.core.config import settings
 from app.core.db import init_db
+from app.core.logging import logger
 from app.api.v1.router import api_router
 
 def create_app() -> FastAPI:
@@ -28,9 +33,58 @@ def create_app() -> FastAPI:
     def health():
         return {"status": "ok", "app": settings.app_name, "env": settings.app_env}
 
+    @application.get("/ready")
+    def ready():
+        """200 once this worker's models are loaded and warm; route traffic on this.
+        A registered model that fails to load keeps it at 503."""
+        from app.services.orchestrator import ml
+        if not ml.ready:
+            errors = ml.errors()
+            if errors:
+                return JSONResponse(status_code=503, content={"status": "model_error", "errors": errors})
+            return JSONResponse(status_code=503, content={"status": "warming"})
+        return {"status": "ready"}
+
+    @application.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        body, content_type = metrics.render()
+        return Response(content=body, media_type=content_type)
+
+    def warm():
+        from app.utils import psl
+        from app.services.orchestrator import ml
+        try:
+            psl.get_extractor()
+            ml.warmup()
+        except Exception as ex:
+            logger.error(f"Warmup failed; /ready stays 503: {ex!r}")
+
     @application.on_event("startup")
     def on_startup():
         init_db()
+        # /health answers during warmup; /ready flips when it's done.
+        threading.Thread(target=warm, name="warmup", daemon=True).start()
+        from app.core.db import SessionLocal
+        from app.services.rollups import missing_rollups
+        with SessionLocal() as db:
+            missing = missing_rollups(db)
+            if missing:
+                logger.warning(
+                    f"{', '.join(missing)} not built for existing analyses; /stats undercounts until "
+                    "`python -m app.cli rebuild-stats` is run."
+                )
+        from app.services.orchestrator import intel, ml, writer
+        writer.start()
+        intel.reputation.start_reloader()
+        ml.start_reloader()
+
+    @application.on_event("shutdown")
+    def on_shutdown():
+        from app.services.orchestrator import intel, ml, writer
+        writer.close()
+        intel.reputation.stop_reloader()
+        ml.stop_reloader()
+        intel.close()
 
     return application
 
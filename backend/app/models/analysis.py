@@ -1,8 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import Iterable
 from app.models.base import Base
 
+# JSONB on Postgres (indexable, queryable with ->>), JSON text elsewhere.
+SignalsType = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
 class Analysis(Base):
     __tablename__ = "analyses"
 
@@ -20,9 +25,23 @@ class Analysis(Base):
 
     raw_excerpt = Column(Text, nullable=True)
 
-    signals = relationship("AnalysisSignal", back_populates="analysis", cascade="all, delete-orphan")
+    # Typed signals, e.g. {"intel_score": 0.4, "shortener": true, "urls_found": [...]}.
+    # NULL for rows written before the column existed; see `signal_values`.
+    signals = Column(SignalsType, nullable=True)
+
+    legacy_signals = relationship("AnalysisSignal", back_populates="analysis", cascade="all, delete-orphan")
+
+    @property
+    def signal_values(self) -> dict:
+        if self.signals is not None:
+            return self.signals
+        return legacy_signals_to_dict((s.key, s.value) for s in self.legacy_signals)
 
 class AnalysisSignal(Base):
+    """Legacy key/value signal rows, superseded by `Analysis.signals`.
+
+    Only read for analyses that haven't been migrated yet
+    (`python -m app.cli migrate-signals`)."""
     __tablename__ = "analysis_signals"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -31,4 +50,20 @@ class AnalysisSignal(Base):
     key = Column(String, nullable=False)
     value = Column(String, nullable=False)
 
-    analysis = relationship("Analysis", back_populates="signals")
+    analysis = relationship("Analysis", back_populates="legacy_signals")
+
+def _legacy_value(key: str, value: str):
+    if key == "urls_found":
+        return [u for u in value.split(",") if u]
+    if value in ("True", "False"):
+        return value == "True"
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+def legacy_signals_to_dict(pairs: Iterable) -> dict:
+    """Typed signals from stringified (key, value) rows."""
+    return {k: _legacy_value(k, v) for k, v in pairs}
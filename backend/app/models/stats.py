@@ -0,0 +1,24 @@
+from sqlalchemy import BigInteger, Column, DateTime, String
+from app.models.base import Base
+
+class StatsCounter(Base):
+    """Running analysis counts, maintained in the write path.
+
+    One row per (dimension, value): ("total", ""), ("type", "sms"),
+    ("level", "HIGH"), ...
+    """
+    __tablename__ = "stats_counters"
+
+    dimension = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+class StatsHourly(Base):
+    """Analysis counts and risk-score sums per hour, type and risk level."""
+    __tablename__ = "stats_hourly"
+
+    bucket_start = Column(DateTime, primary_key=True)  # UTC, truncated to the hour
+    type = Column(String, primary_key=True)
+    risk_level = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)
@@ -23,3 +23,6 @@ class AnalyzeResponse(BaseModel):
     reasons: List[str]
     recommended_actions: List[str]
     analysis_id: str
+
+class AnalyzeBatchResponse(BaseModel):
+    results: List[AnalyzeResponse]
@@ -1,8 +1,13 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+from app.core.config import settings
 
 class AnalyzeEmailRequest(BaseModel):
     subject: Optional[str] = None
     sender: Optional[str] = None
     body: str
     headers_raw: Optional[str] = None
+
+class AnalyzeEmailBatchRequest(BaseModel):
+    items: List[AnalyzeEmailRequest] = Field(..., min_length=1, max_length=settings.batch_max_items)
@@ -1,6 +1,11 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+from app.core.config import settings
 
 class AnalyzeSMSRequest(BaseModel):
     text: str
     sender: Optional[str] = None
+
+class AnalyzeSMSBatchRequest(BaseModel):
+    items: List[AnalyzeSMSRequest] = Field(..., min_length=1, max_length=settings.batch_max_items)
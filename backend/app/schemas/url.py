@@ -1,4 +1,16 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
+from typing import List
+
+from app.core.config import settings
+from app.utils.url_features import check_url
 
 class AnalyzeURLRequest(BaseModel):
     url: str
+
+    @field_validator("url")
+    @classmethod
+    def _parseable(cls, url: str) -> str:
+        return check_url(url)
+
+class AnalyzeURLBatchRequest(BaseModel):
+    items: List[AnalyzeURLRequest] = Field(..., min_length=1, max_length=settings.batch_max_items)
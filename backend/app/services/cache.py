@@ -1,49 +1,309 @@
 import json
-from typing import Any, Optional
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
 
 import redis
 
+from app.core import metrics
 from app.core.config import settings
 from app.core.logging import logger
+from app.utils.lru import TTLCache
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+
+
+_REDIS_DOWN = (redis.ConnectionError, redis.TimeoutError, OSError)
+
+
+class CircuitBreaker:
+    """Keeps a dead Redis off the request path.
+
+    After `threshold` consecutive connection failures the breaker opens and
+    callers skip Redis without touching the network. A background probe pings
+    with exponential backoff (`base_delay` doubling up to `max_delay`) and
+    closes the breaker once Redis answers.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    _GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, probe: Callable[[], Any], threshold: int, base_delay: float, max_delay: float):
+        self._probe = probe
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._set_state(self.CLOSED)
+        self.trips = 0
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        metrics.REDIS_BREAKER_STATE.set(self._GAUGE[state])
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        self._ensure_probe()
+        return False
+
+    def record_success(self) -> None:
+        if self._failures:
+            with self._lock:
+                self._failures = 0
+
+    def record_failure(self, ex: Exception) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state != self.CLOSED or self._failures < self.threshold:
+                return
+            self._set_state(self.OPEN)
+            self.trips += 1
+            metrics.REDIS_BREAKER_TRIPS.inc()
+        logger.info(f"Redis unavailable (cache disabled until it recovers): {ex}")
+        self._ensure_probe()
+
+    def _ensure_probe(self) -> None:
+        with self._lock:
+            alive = self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid()
+            if alive or self.state == self.CLOSED:
+                return
+            self._thread = threading.Thread(target=self._run_probe, name="redis-probe", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run_probe(self) -> None:
+        delay = self.base_delay
+        while True:
+            time.sleep(delay)
+            self._set_state(self.HALF_OPEN)
+            try:
+                self._probe()
+            except Exception:
+                self._set_state(self.OPEN)
+                delay = min(delay * 2, self.max_delay)
+                continue
+            with self._lock:
+                self._failures = 0
+                self._set_state(self.CLOSED)
+            logger.info("Redis reachable again (cache enabled).")
+            return
 
 
 class CacheStore:
-    """Best-effort Redis cache.
+    """Best-effort two-tier cache: a bounded in-process LRU/TTL tier in front
+    of Redis.
 
-    If Redis is unavailable, all operations no-op.
+    If Redis is unavailable, only the local tier is used: a circuit breaker
+    stops Redis calls after repeated connection failures and a background
+    probe re-enables them. Values returned from the local tier are shared
+    between callers and must be treated as read-only.
     """
 
     def __init__(self):
         self._client: Optional[redis.Redis] = None
+        self._client_lock = threading.Lock()
+        self.breaker = CircuitBreaker(
+            probe=lambda: self._connect().ping(),
+            threshold=settings.redis_breaker_threshold,
+            base_delay=settings.redis_breaker_base_delay_seconds,
+            max_delay=settings.redis_breaker_max_delay_seconds,
+        )
+        self._local = TTLCache(maxsize=settings.cache_local_size)
+        self._local_ttl = settings.cache_local_ttl_seconds
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._counts_lock = threading.Lock()
 
-    def _get_client(self) -> Optional[redis.Redis]:
-        if self._client is not None:
+    def _count(self, name: str, n: int = 1) -> None:
+        if n:
+            with self._counts_lock:
+                self._counts[name] = self._counts.get(name, 0) + n
+
+    def stats(self) -> dict:
+        with self._counts_lock:
+            c = dict(self._counts)
+        return {
+            "local": {"hits": c.get("local_hits", 0), "misses": c.get("local_misses", 0), "size": len(self._local)},
+            "redis": {
+                "hits": c.get("redis_hits", 0),
+                "misses": c.get("redis_misses", 0),
+                "state": self.breaker.state,
+                "trips": self.breaker.trips,
+            },
+            "collapsed": c.get("collapsed", 0),
+        }
+
+    def _connect(self) -> redis.Redis:
+        with self._client_lock:
+            if self._client is None:
+                # One pool per process; redis-py reconnects lazily and
+                # replaces the pool's connections after a fork.
+                pool = redis.ConnectionPool.from_url(
+                    settings.redis_url,
+                    decode_responses=True,
+                    socket_timeout=settings.redis_socket_timeout_seconds,
+                    socket_connect_timeout=settings.redis_connect_timeout_seconds,
+                    max_connections=settings.redis_max_connections,
+                )
+                self._client = redis.Redis(connection_pool=pool)
             return self._client
+
+    def _get_client(self) -> Optional[redis.Redis]:
+        if not self.breaker.allow():
+            return None
         try:
-            self._client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
-            # Ping once to confirm connectivity.
-            self._client.ping()
-            return self._client
+            return self._connect()
         except Exception as ex:
-            logger.info(f"Redis unavailable (cache disabled): {ex}")
-            self._client = None
+            logger.info(f"Redis misconfigured (cache disabled): {ex}")
             return None
 
+    def _set_local(self, key: str, value: Any, ttl_seconds: int) -> None:
+        self._local.set(key, value, ttl_seconds=min(ttl_seconds, self._local_ttl))
+
     def get_json(self, key: str) -> Optional[dict]:
+        return self.get_many_json([key])[0]
+
+    def set_json(self, key: str, value: Any, ttl_seconds: int = 3600) -> None:
+        self.set_many_json({key: value}, ttl_seconds=ttl_seconds)
+
+    def get_many_json(self, keys: List[str], local: bool = True) -> List[Optional[dict]]:
+        """Fetch several keys: local tier first, then one MGET for the rest.
+        Misses come back as None."""
+        results: List[Optional[dict]] = [None] * len(keys)
+        pending = []
+        for i, key in enumerate(keys):
+            value = self._local.get(key) if local else None
+            if value is None:
+                pending.append(i)
+            else:
+                results[i] = value
+        if local:
+            self._count("local_hits", len(keys) - len(pending))
+            self._count("local_misses", len(pending))
+            metrics.CACHE_LOOKUPS.labels("local", "hit").inc(len(keys) - len(pending))
+            metrics.CACHE_LOOKUPS.labels("local", "miss").inc(len(pending))
+
         c = self._get_client()
-        if not c:
-            return None
+        if not c or not pending:
+            return results
         try:
-            raw = c.get(key)
-            return json.loads(raw) if raw else None
+            raws = c.mget([keys[i] for i in pending])
+        except _REDIS_DOWN as ex:
+            self.breaker.record_failure(ex)
+            return results
         except Exception:
-            return None
+            return results
+        self.breaker.record_success()
 
-    def set_json(self, key: str, value: Any, ttl_seconds: int = 3600) -> None:
+        hits = 0
+        for i, raw in zip(pending, raws):
+            if not raw:
+                continue
+            try:
+                results[i] = json.loads(raw)
+            except ValueError:
+                continue
+            hits += 1
+            if local:
+                self._local.set(keys[i], results[i], ttl_seconds=self._local_ttl)
+        self._count("redis_hits", hits)
+        self._count("redis_misses", len(pending) - hits)
+        metrics.CACHE_LOOKUPS.labels("redis", "hit").inc(hits)
+        metrics.CACHE_LOOKUPS.labels("redis", "miss").inc(len(pending) - hits)
+        return results
+
+    def set_many_json(self, values: Dict[str, Any], ttl_seconds: int = 3600, local: bool = True) -> None:
+        if not values:
+            return
+        if local:
+            for key, value in values.items():
+                self._set_local(key, value, ttl_seconds)
         c = self._get_client()
         if not c:
             return
         try:
-            c.setex(key, ttl_seconds, json.dumps(value))
+            pipe = c.pipeline(transaction=False)
+            for key, value in values.items():
+                pipe.setex(key, ttl_seconds, json.dumps(value))
+            pipe.execute()
+        except _REDIS_DOWN as ex:
+            self.breaker.record_failure(ex)
         except Exception:
             return
+        else:
+            self.breaker.record_success()
+
+    def get_or_compute_many(
+        self,
+        keys: List[str],
+        compute: Callable[[List[str]], List[Any]],
+        ttl_seconds: int = 3600,
+    ) -> List[Any]:
+        """Resolve every key from the cache, computing the misses at most once.
+
+        Distinct missing keys are claimed by the calling thread and passed to
+        one compute() call. Keys another thread is already computing are
+        waited for instead, so a burst of identical requests runs the pipeline
+        once. Results are returned in input order.
+        """
+        results = self.get_many_json(keys)
+        missing = list(dict.fromkeys(k for k, v in zip(keys, results) if v is None))
+        if not missing:
+            return results
+
+        mine, theirs = [], {}
+        with self._flights_lock:
+            for key in missing:
+                flight = self._flights.get(key)
+                if flight is None:
+                    self._flights[key] = _Flight()
+                    mine.append(key)
+                else:
+                    theirs[key] = flight
+
+        fresh: Dict[str, Any] = {}
+        if mine:
+            try:
+                # A flight for some of these may have landed since the lookup.
+                for key in mine:
+                    value = self._local.get(key)
+                    if value is not None:
+                        fresh[key] = value
+                todo = [k for k in mine if k not in fresh]
+                if todo:
+                    computed = dict(zip(todo, compute(todo)))
+                    self.set_many_json(computed, ttl_seconds=ttl_seconds)
+                    fresh.update(computed)
+            finally:
+                with self._flights_lock:
+                    for key in mine:
+                        flight = self._flights.pop(key)
+                        flight.value = fresh.get(key)
+                        flight.done.set()
+
+        leftover = []
+        for key, flight in theirs.items():
+            if flight.done.wait(timeout=settings.cache_flight_timeout_seconds) and flight.value is not None:
+                fresh[key] = flight.value
+                self._count("collapsed")
+            else:
+                leftover.append(key)
+        if leftover:
+            # The other computation failed or is stuck; don't fail with it.
+            computed = dict(zip(leftover, compute(leftover)))
+            self.set_many_json(computed, ttl_seconds=ttl_seconds)
+            fresh.update(computed)
+
+        return [v if v is not None else fresh[k] for k, v in zip(keys, results)]
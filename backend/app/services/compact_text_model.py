@@ -0,0 +1,102 @@
+"""The calibrated text ensemble as one vectorizer pass.
+
+ml.train_text fits CalibratedClassifierCV(cv=3) over TF-IDF + LogisticRegression,
+which at inference runs three TF-IDF transforms (three vocabularies) and three
+isotonic calibrators and averages them. For fold k the positive-class
+probability is
+
+    iso_k((w_k . (c * idf_k)) / ||c * idf_k|| + b_k)
+
+where c is the document's raw term counts over fold k's vocabulary. Counting
+terms once over the union vocabulary gives every fold's numerator and squared
+norm from a single sparse count matrix C:
+
+    C @ W   with W[:, k] = w_k * idf_k
+    C² @ S  with S[:, k] = idf_k² (0 for terms outside fold k)
+
+so CompactTextModel reproduces the ensemble's probabilities (to float rounding)
+with one tokenizer, one vocabulary and a few small lookup tables.
+"""
+from __future__ import annotations
+from typing import List
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+
+# TfidfVectorizer parameters that don't affect tokenization.
+_TFIDF_ONLY = ("norm", "use_idf", "smooth_idf", "sublinear_tf", "max_df", "min_df", "max_features", "dtype", "vocabulary")
+
+class CompactTextModel:
+    """Drop-in for the calibrated text model: predict_proba(texts) -> (n, 2)."""
+
+    def __init__(self, vectorizer: CountVectorizer, weights: np.ndarray, norms: np.ndarray,
+                 intercepts: np.ndarray, calibration: List[tuple], classes: np.ndarray):
+        self.vectorizer = vectorizer
+        self.weights = weights          # (n_terms, n_folds)
+        self.norms = norms              # (n_terms, n_folds)
+        self.intercepts = intercepts    # (n_folds,)
+        self.calibration = calibration  # per fold: (x_thresholds, y_thresholds)
+        self.classes_ = classes
+
+    @classmethod
+    def from_calibrated(cls, calibrated) -> "CompactTextModel":
+        """Export a fitted binary CalibratedClassifierCV(Pipeline[tfidf, clf])
+        with isotonic calibration."""
+        folds = calibrated.calibrated_classifiers_
+        if len(calibrated.classes_) != 2:
+            raise ValueError("only binary text models can be exported")
+
+        tfidfs, clfs = [], []
+        for fold in folds:
+            steps = fold.estimator.steps
+            tfidf, clf = steps[0][1], steps[-1][1]
+            if len(steps) != 2 or tfidf.norm != "l2" or tfidf.sublinear_tf:
+                raise ValueError("expected Pipeline([TfidfVectorizer(norm='l2'), linear classifier])")
+            if not hasattr(fold.calibrators[0], "X_thresholds_"):
+                raise ValueError("only isotonic calibration can be exported")
+            tfidfs.append(tfidf)
+            clfs.append(clf)
+
+        terms = sorted(set().union(*(t.vocabulary_ for t in tfidfs)))
+        vocabulary = {term: i for i, term in enumerate(terms)}
+        params = {k: v for k, v in tfidfs[0].get_params().items() if k not in _TFIDF_ONLY}
+        vectorizer = CountVectorizer(vocabulary=vocabulary, dtype=np.float64, **params)
+
+        weights = np.zeros((len(terms), len(folds)))
+        norms = np.zeros((len(terms), len(folds)))
+        for k, (tfidf, clf) in enumerate(zip(tfidfs, clfs)):
+            cols = np.fromiter((vocabulary[t] for t in tfidf.get_feature_names_out()), dtype=np.int64)
+            idf = tfidf.idf_ if tfidf.use_idf else np.ones(len(cols))
+            weights[cols, k] = clf.coef_[0] * idf
+            norms[cols, k] = idf * idf
+
+        return cls(
+            vectorizer=vectorizer,
+            weights=weights,
+            norms=norms,
+            intercepts=np.array([clf.intercept_[0] for clf in clfs]),
+            calibration=[(f.calibrators[0].X_thresholds_, f.calibrators[0].y_thresholds_) for f in folds],
+            classes=calibrated.classes_,
+        )
+
+    def decision_function(self, texts: List[str]) -> np.ndarray:
+        """Per-fold logistic decision values, shape (n, n_folds)."""
+        counts = self.vectorizer.transform(texts)
+        scores = np.asarray(counts @ self.weights)
+        counts.data **= 2
+        norm = np.sqrt(np.asarray(counts @ self.norms))
+        np.divide(scores, norm, out=scores, where=norm > 0)
+        return scores + self.intercepts
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        scores = self.decision_function(texts)
+        pos = np.zeros(len(scores))
+        for k, (xs, ys) in enumerate(self.calibration):
+            p = np.interp(scores[:, k], xs, ys)
+            p[(p > 1.0) & (p <= 1.0 + 1e-5)] = 1.0
+            pos += p
+        pos /= len(self.calibration)
+        return np.column_stack([1.0 - pos, pos])
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        return self.classes_[(self.predict_proba(texts)[:, 1] > 0.5).astype(int)]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from functools import cached_property
+from typing import List
+
+from app.utils.rulepacks import RuleScan, match_rules
+from app.utils.text_normalize import extract_urls, normalize_text
+from app.utils.url_features import ParsedURL, parse_url
+
+# Intel only inspects this many links per message.
+INSPECTED_URLS = 3
+
+def email_raw_text(subject, sender, headers_raw, body: str) -> str:
+    """What the model scores for an email: subject and sender lines, the raw
+    headers, then the body. Every email entry point builds it here."""
+    return "\n".join([
+        f"Subject: {subject or ''}",
+        f"From: {sender or ''}",
+        headers_raw or "",
+        body,
+    ]).strip()
+
+def _may_span(prefix: str, body: str) -> bool:
+    """Whether a normalize_text pattern could match across prefix|body.
+
+    Without a line break at the seam any pattern might (a URL running into the
+    body, an OTP phrase split at a space). A line break stops URLs and OTP
+    phrases; only phone numbers and KSh amounts allow `\\s` inside a match, so
+    those are the ones checked for.
+    """
+    if not prefix.endswith("\n"):
+        return True
+    tail = prefix.rstrip().lower()
+    head = body.lstrip().lower()
+    if not tail or not head:
+        return False
+    return (
+        (tail[-1] in "-" or tail[-1].isdigit()) and (head[0] in "-" or head[0].isdigit())
+        or tail.endswith(("ksh", "kes")) and head[0].isdigit()
+        or (tail[-1] in ",." or tail[-1].isdigit()) and head.startswith(("ksh", "kes"))
+    )
+
+class AnalysisContext:
+    """One text input and everything derived from it.
+
+    Built once per request by the orchestrator; the model, intel and
+    explanation stages all read from it, so each view is computed at most once.
+    `raw_text` is what the model scores (for email it includes the headers),
+    `text` is what the user sees and what intel/explanations inspect.
+    """
+
+    def __init__(self, raw_text: str, user_visible_text: str):
+        self.raw_text = raw_text or ""
+        self.text = user_visible_text or ""
+
+    @cached_property
+    def clean(self) -> str:
+        return normalize_text(self.text)
+
+    @cached_property
+    def clean_raw(self) -> str:
+        if self.raw_text == self.text:
+            return self.clean
+        body = self.text.rstrip()
+        if body and self.raw_text.endswith(body):
+            prefix = self.raw_text[:-len(body)]
+            if not _may_span(prefix, body):
+                return " ".join(p for p in (normalize_text(prefix), self.clean) if p)
+        return normalize_text(self.raw_text)
+
+    @cached_property
+    def urls(self) -> List[str]:
+        return extract_urls(self.text)
+
+    @cached_property
+    def links(self) -> List[ParsedURL]:
+        """The inspected links, parsed."""
+        return [parse_url(u) for u in self.urls[:INSPECTED_URLS]]
+
+    @cached_property
+    def rules(self) -> RuleScan:
+        return match_rules(self.clean)
+
+    def prime(self) -> None:
+        """Compute the rule scan and links now rather than on first use, so
+        the pipeline can time them as their own stage. Reading a
+        cached_property is what fills it."""
+        _ = self.rules
+        _ = self.links
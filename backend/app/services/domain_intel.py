@@ -0,0 +1,80 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.services.cache import CacheStore
+from app.services.rdap import RDAPClient, age_days
+from app.utils.lru import TTLCache
+
+_MISSING = object()
+
+class DomainIntelStore:
+    """Registration dates per registrable domain, looked up as rarely as possible.
+
+    Reads go in-process LRU -> Redis (`rdap:<domain>`) -> RDAP. A known
+    registration date is kept for DOMAIN_INTEL_TTL_SECONDS; failures, timeouts
+    and domains RDAP has no date for are kept for
+    DOMAIN_INTEL_NEGATIVE_TTL_SECONDS, so a flaky registry or a brand-new
+    domain is retried soon without being hammered by every message.
+    """
+
+    def __init__(self, rdap: RDAPClient, cache: Optional[CacheStore] = None):
+        self.rdap = rdap
+        self.cache = cache
+        self.ttl_seconds = settings.domain_intel_ttl_seconds
+        self.negative_ttl_seconds = settings.domain_intel_negative_ttl_seconds
+        self._lru = TTLCache(maxsize=settings.domain_intel_lru_size)
+
+    @staticmethod
+    def _key(domain: str) -> str:
+        return f"rdap:{domain}"
+
+    def _remember(self, found: Dict[str, Optional[datetime]], write_through: bool) -> None:
+        by_ttl: Dict[int, Dict[str, dict]] = {}
+        for domain, created in found.items():
+            ttl = self.ttl_seconds if created is not None else self.negative_ttl_seconds
+            self._lru.set(domain, created, ttl_seconds=ttl)
+            by_ttl.setdefault(ttl, {})[self._key(domain)] = {
+                "created": created.isoformat() if created else None,
+            }
+        if write_through and self.cache is not None:
+            for ttl, values in by_ttl.items():
+                self.cache.set_many_json(values, ttl_seconds=ttl, local=False)
+
+    def registration_dates(self, domains: Iterable[str]) -> Dict[str, Optional[datetime]]:
+        domains = list(dict.fromkeys(d.lower() for d in domains if d))
+        result: Dict[str, Optional[datetime]] = {}
+
+        pending = []
+        for d in domains:
+            created = self._lru.get(d, _MISSING)
+            if created is _MISSING:
+                pending.append(d)
+            else:
+                result[d] = created
+
+        if pending and self.cache is not None:
+            from_redis = {}
+            for d, record in zip(pending, self.cache.get_many_json([self._key(d) for d in pending], local=False)):
+                if record is not None:
+                    created = record.get("created")
+                    from_redis[d] = datetime.fromisoformat(created) if created else None
+            # Already in Redis; only fill the LRU.
+            self._remember(from_redis, write_through=False)
+            result.update(from_redis)
+            pending = [d for d in pending if d not in from_redis]
+
+        if pending:
+            looked_up = self.rdap.registration_dates(pending)
+            self._remember(looked_up, write_through=True)
+            result.update(looked_up)
+        return result
+
+    def registration_date(self, domain: str) -> Optional[datetime]:
+        if not domain:
+            return None
+        return self.registration_dates([domain]).get(domain.lower())
+
+    def age_days(self, domain: str) -> Optional[int]:
+        return age_days(self.registration_date(domain))
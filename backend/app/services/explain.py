@@ -1,14 +1,15 @@
-from app.utils.rulepacks import KENYA_MPESA_RULEPACK, GENERAL_RULEPACK, find_rule_hits
-from app.utils.text_normalize import normalize_text
+from app.services.context import AnalysisContext
 
 class Explainer:
     def explain_text(self, text: str, ml_prob: float, intel: dict, level: str):
+        return self.explain_context(AnalysisContext(text, text), ml_prob, intel, level)
+
+    def explain_context(self, ctx: AnalysisContext, ml_prob: float, intel: dict, level: str):
         reasons = []
         actions = []
+        text = ctx.text
 
-        clean = normalize_text(text)
-
-        hits = find_rule_hits(clean, KENYA_MPESA_RULEPACK) + find_rule_hits(clean, GENERAL_RULEPACK)
+        hits = ctx.rules.hits
         if hits:
             hits = sorted(hits, key=lambda x: x["weight"], reverse=True)[:5]
             reasons.extend([h["reason"] for h in hits])
@@ -1,124 +1,102 @@
 from __future__ import annotations
-import re
-from urllib.parse import urlparse
-import httpx
-import tldextract
-
-from app.core.config import settings
-from app.core.logging import logger
-from app.utils.text_normalize import normalize_text
-from app.utils.rulepacks import score_text_rules, KENYA_MPESA_RULEPACK
+from typing import Iterable, Optional
+
+from app.services.cache import CacheStore
+from app.services.context import AnalysisContext
+from app.services.domain_intel import DomainIntelStore
+from app.services.rdap import RDAPClient
 from app.utils.reputation import ReputationStore
 from app.utils.url_features import (
     is_shortener_domain, looks_like_ip_host, suspicious_tld, count_dots,
-    url_length, has_at_symbol, has_punycode, has_misleading_subdomain
+    url_length, has_at_symbol, has_punycode, has_misleading_subdomain, parse_url
 )
 
-URL_RE = re.compile(r'(https?://[^\s<>"]+|www\.[^\s<>"]+)', re.IGNORECASE)
-
 class IntelLayer:
-    def __init__(self):
-        self.reputation = ReputationStore()
+    """Reputation lists and domain age for links. With `network=False` no
+    RDAP lookups are made and domain_age_days is always None."""
 
-    def _extract_urls(self, text: str):
-        urls = []
-        for m in URL_RE.finditer(text or ""):
-            u = m.group(0).strip().rstrip(").,;!")
-            if u.lower().startswith("www."):
-                u = "http://" + u
-            urls.append(u)
-        return list(dict.fromkeys(urls))
+    def __init__(self, cache: Optional[CacheStore] = None, network: bool = True):
+        self.reputation = ReputationStore()
+        self.rdap = RDAPClient()
+        self.domains = DomainIntelStore(self.rdap, cache=cache) if network else None
 
     def _domain_age_days(self, domain: str):
-        try:
-            with httpx.Client(timeout=settings.rdap_timeout_seconds) as client:
-                r = client.get(f"https://rdap.org/domain/{domain}")
-                if r.status_code != 200:
-                    return None
-                data = r.json()
-                events = data.get("events", [])
-                created = None
-                for e in events:
-                    if e.get("eventAction") in ("registration", "registered", "creation"):
-                        created = e.get("eventDate")
-                        break
-                if not created:
-                    return None
-                from datetime import datetime, timezone
-                dt = datetime.fromisoformat(created.replace("Z", "+00:00"))
-                now = datetime.now(timezone.utc)
-                return max(0, int((now - dt).total_seconds() // 86400))
-        except Exception as ex:
-            logger.info(f"RDAP lookup failed for {domain}: {ex}")
+        if self.domains is None:
             return None
+        return self.domains.age_days(domain)
 
-    def inspect_text(self, text: str):
-        clean = normalize_text(text)
-        urls = self._extract_urls(text)
+    def prefetch_domains(self, domains: Iterable[str]) -> None:
+        """Resolve registration dates for a batch concurrently, ahead of
+        inspect_*. The lookups overlap each other but the caller's thread
+        waits for them, up to RDAP_TIMEOUT_SECONDS."""
+        if self.domains is not None:
+            self.domains.registration_dates(domains)
+
+    def close(self):
+        self.rdap.close()
 
-        h = score_text_rules(clean, rulepack=KENYA_MPESA_RULEPACK)
+    def inspect_text(self, text: str):
+        return self.inspect_context(AnalysisContext(text, text))
 
+    def inspect_context(self, ctx: AnalysisContext):
         shortener = False
         rep_hit = False
         domain_age = None
         notes = {}
         t = 0.0
 
-        for u in urls[:3]:
-            parsed = urlparse(u)
-            host = parsed.hostname or ""
-            ext = tldextract.extract(host)
-            domain = ".".join([p for p in [ext.domain, ext.suffix] if p])
-            if not domain:
+        for link in ctx.links:
+            if not link.domain:
                 continue
 
-            if is_shortener_domain(domain):
+            if is_shortener_domain(link):
                 shortener = True
                 t += 0.25
 
-            if self.reputation.is_bad_domain(domain) or self.reputation.is_bad_url(u):
+            if self.reputation.is_bad_domain(link.host or link.domain) or self.reputation.is_bad_url(link.url):
                 rep_hit = True
                 t += 0.50
 
             if domain_age is None:
-                domain_age = self._domain_age_days(domain)
+                domain_age = self._domain_age_days(link.domain)
                 if domain_age is not None and domain_age < 30:
                     t += 0.25
                     notes["domain_age_reason"] = f"Domain looks newly registered ({domain_age} days)."
 
         t = min(1.0, t)
         return {
-            "urls_found": urls,
+            "urls_found": ctx.urls,
             "shortener": shortener,
             "reputation_hit": rep_hit,
             "domain_age_days": domain_age,
             "redirects": [],
             "notes": notes,
-            "heuristic_score": h,
+            "heuristic_score": ctx.rules.score,
             "intel_score": t,
         }
 
+    def registrable_domain(self, url: str) -> str:
+        return parse_url(url).domain
+
     def inspect_url(self, url: str):
-        parsed = urlparse(url if url.startswith(("http://", "https://")) else "http://" + url)
-        host = parsed.hostname or ""
-        ext = tldextract.extract(host)
-        domain = ".".join([p for p in [ext.domain, ext.suffix] if p])
+        p = parse_url(url)
+        host, domain = p.host, p.domain
 
-        dotc = count_dots(host)
-        length = url_length(url)
+        dotc = count_dots(p)
+        length = url_length(p)
 
         score = 0.0
-        if is_shortener_domain(domain):
+        if is_shortener_domain(p):
             score += 0.25
-        if looks_like_ip_host(host):
+        if looks_like_ip_host(p):
             score += 0.25
-        if suspicious_tld(domain):
+        if suspicious_tld(p):
             score += 0.15
-        if has_at_symbol(url):
+        if has_at_symbol(p):
             score += 0.15
-        if has_punycode(host):
+        if has_punycode(p):
             score += 0.15
-        if has_misleading_subdomain(host):
+        if has_misleading_subdomain(p):
             score += 0.15
         if length >= 80:
             score += 0.15
@@ -128,7 +106,7 @@ class IntelLayer:
 
         rep_hit = False
         t = 0.0
-        if domain and (self.reputation.is_bad_domain(domain) or self.reputation.is_bad_url(url)):
+        if domain and (self.reputation.is_bad_domain(host or domain) or self.reputation.is_bad_url(url)):
             rep_hit = True
             t += 0.6
 
@@ -140,12 +118,12 @@ class IntelLayer:
         t = min(1.0, t)
 
         return {
-            "shortener": is_shortener_domain(domain),
+            "shortener": is_shortener_domain(p),
             "reputation_hit": rep_hit,
             "domain_age_days": domain_age,
             "url_length": length,
             "dot_count": dotc,
-            "has_ip": looks_like_ip_host(host),
+            "has_ip": looks_like_ip_host(p),
             "redirects": [],
             "notes": {"domain": domain, "host": host},
             "heuristic_score": score,
@@ -0,0 +1,82 @@
+from __future__ import annotations
+import time
+from typing import Optional
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.logging import logger
+from app.models.analysis import Analysis, AnalysisSignal, legacy_signals_to_dict
+
+def migrate_signals(
+    db: Session,
+    chunk_size: int = 1000,
+    delete_legacy: bool = False,
+    pause_seconds: float = 0.0,
+    limit: Optional[int] = None,
+) -> int:
+    """Fill `analyses.signals` from legacy `analysis_signals` rows.
+
+    Walks the analyses in primary-key order (keyset pagination, no OFFSET)
+    and commits after every chunk, so each transaction only locks
+    `chunk_size` rows and the API keeps writing meanwhile. Rows that already
+    have a signals value are skipped, which makes the migration resumable.
+    Returns the number of analyses converted.
+    """
+    converted = 0
+    last_id = ""
+    set_signals = (
+        update(Analysis.__table__)
+        .where(Analysis.__table__.c.id == bindparam("b_id"))
+        .values(signals=bindparam("b_signals"))
+    )
+    while limit is None or converted < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - converted)
+        ids = db.execute(
+            select(Analysis.id)
+            .where(Analysis.id > last_id, Analysis.signals.is_(None))
+            .order_by(Analysis.id)
+            .limit(size)
+        ).scalars().all()
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        pairs = {i: [] for i in ids}
+        for analysis_id, key, value in db.execute(
+            select(AnalysisSignal.analysis_id, AnalysisSignal.key, AnalysisSignal.value)
+            .where(AnalysisSignal.analysis_id.in_(ids))
+            .order_by(AnalysisSignal.id)
+        ):
+            pairs[analysis_id].append((key, value))
+
+        db.execute(
+            set_signals,
+            [{"b_id": i, "b_signals": legacy_signals_to_dict(p)} for i, p in pairs.items()],
+        )
+        if delete_legacy:
+            db.execute(delete(AnalysisSignal).where(AnalysisSignal.analysis_id.in_(ids)))
+        db.commit()
+
+        converted += len(ids)
+        logger.info(f"Migrated signals for {converted} analyses (last id {last_id}).")
+        if pause_seconds:
+            time.sleep(pause_seconds)
+    return converted
+
+def delete_migrated_legacy_signals(db: Session, chunk_size: int = 1000) -> int:
+    """Delete legacy signal rows whose analysis already has `signals`, in
+    chunks. Returns the number of rows deleted."""
+    deleted = 0
+    while True:
+        ids = db.execute(
+            select(AnalysisSignal.id)
+            .join(Analysis, Analysis.id == AnalysisSignal.analysis_id)
+            .where(Analysis.signals.is_not(None))
+            .limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            return deleted
+        db.execute(delete(AnalysisSignal).where(AnalysisSignal.id.in_(ids)))
+        db.commit()
+        deleted += len(ids)
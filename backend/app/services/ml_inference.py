@@ -1,55 +1,245 @@
 from __future__ import annotations
 import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
 import joblib
+import numpy as np
+from app.core import metrics
 from app.core.config import settings
 from app.core.logging import logger
+from app.services import model_registry
+from app.services.model_registry import KINDS, ModelEntry
 from app.utils.text_normalize import normalize_text
-from app.utils.url_features import url_to_features
+from app.utils.url_features import parse_url, url_feature_matrix, url_to_features
 
-MODEL_VERSION_TEXT = "text-v1"
-MODEL_VERSION_URL = "url-v1"
+# From this many URLs on, features are built with url_feature_matrix.
+VECTORIZED_URL_BATCH = 64
+
+WARMUP_INPUTS = {
+    "text": ("Warmup: your M-PESA account will be locked, verify now at http://example.com",),
+    "url": ("http://example.com/warmup",),
+}
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _fmt_bytes(n: int) -> str:
+    return f"{n / 2**20:.1f} MiB" if abs(n) >= 2**20 else f"{n / 1024:.0f} KiB"
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """An immutable (manifest entry, model) pair. Predictions read the
+    current one once, so a swap never mixes two models in one batch. `error`
+    is set when a model the manifest lists could not be loaded."""
+    entry: ModelEntry
+    model: Any
+    error: Optional[str] = None
+
+    @property
+    def version(self) -> str:
+        return self.entry.version if self.model is not None else "fallback"
+
+def _load_model(entry: ModelEntry) -> LoadedModel:
+    """Load and checksum-verify `entry`; raises if it can't be used."""
+    path = str(entry.path)
+    if entry.sha256 and model_registry.sha256_file(path) != entry.sha256:
+        raise ValueError(f"{path} does not match the manifest checksum")
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    model = joblib.load(path)
+    elapsed = time.perf_counter() - start
+    rss_after = _rss_bytes()
+    size = f"{_fmt_bytes(os.path.getsize(path))} on disk"
+    if rss_before is not None and rss_after is not None:
+        size += f", +{_fmt_bytes(rss_after - rss_before)} RSS"
+    logger.info(f"Loaded {entry.kind} model {entry.version}: {path} in {elapsed:.2f}s ({size})")
+    return LoadedModel(entry, model)
+
+def _text_probs(model, cleans: List[str]) -> np.ndarray:
+    return model.predict_proba(cleans)[:, 1]
+
+def _url_probs(model, urls: List[str]) -> np.ndarray:
+    if len(urls) >= VECTORIZED_URL_BATCH:
+        feats = url_feature_matrix(urls)
+    else:
+        # Small batches reuse the parses intel already memoized.
+        feats = [url_to_features(parse_url(u)) for u in urls]
+    return model.predict_proba(feats)[:, 1]
+
+def validate_model(kind: str, model) -> float:
+    """Run the smoke set through `model` the way requests would. Raises
+    ValueError unless every probability is finite and in [0, 1] and accuracy
+    reaches the smoke set's min_accuracy; returns the accuracy."""
+    inputs, labels, min_accuracy = model_registry.load_smoke_set(kind)
+    if not inputs:
+        inputs, labels, min_accuracy = list(WARMUP_INPUTS[kind]), [], 0.0
+    if kind == "text":
+        probs = _text_probs(model, [normalize_text(t) for t in inputs])
+    else:
+        probs = _url_probs(model, inputs)
+    probs = np.asarray(probs, dtype=float)
+    if probs.shape != (len(inputs),):
+        raise ValueError(f"expected {len(inputs)} probabilities, got shape {probs.shape}")
+    if not np.all(np.isfinite(probs)) or probs.min() < 0 or probs.max() > 1:
+        raise ValueError("probabilities outside [0, 1]")
+    if not labels:
+        return 1.0
+    accuracy = float(np.mean((probs >= 0.5) == np.asarray(labels, dtype=bool)))
+    if accuracy < min_accuracy:
+        raise ValueError(f"smoke set accuracy {accuracy:.2f} < {min_accuracy:.2f}")
+    return accuracy
 
 class MLInference:
+    """Serves the text and URL models named by the model manifest.
+
+    Models load lazily (or in warmup()) and can be replaced at runtime:
+    reload() loads the manifest's current artifacts next to the live ones,
+    checks them against the smoke set and swaps each in with one reference
+    assignment. Requests already running finish on the model they started
+    with; a candidate that fails to load or validate is logged and ignored.
+    """
+
     def __init__(self):
-        self._text_model = None
-        self._url_model = None
+        self._models: Dict[str, LoadedModel] = {}
+        self._load_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._warm = False
+
+    def _get(self, kind: str) -> LoadedModel:
+        loaded = self._models.get(kind)
+        if loaded is not None:
+            return loaded
+        with self._load_lock:
+            loaded = self._models.get(kind)
+            if loaded is None:
+                manifest = model_registry.read_manifest()
+                entry = model_registry.resolve(kind, manifest)
+                try:
+                    loaded = _load_model(entry)
+                except Exception as ex:
+                    if isinstance(ex, FileNotFoundError) and kind not in manifest:
+                        logger.warning(f"{kind} model not found at {entry.path}. Using heuristic-only fallback.")
+                        loaded = LoadedModel(entry, None)
+                    else:
+                        # A registered model that doesn't load is an error, not
+                        # a fallback: /ready stays 503 until a reload fixes it.
+                        logger.error(f"Could not load {kind} model {entry.version}: {ex}. Not ready.")
+                        loaded = LoadedModel(entry, None, error=f"{entry.version}: {ex}")
+                self._models[kind] = loaded
+                metrics.set_model_version(kind, loaded.version)
+        return loaded
+
+    def version(self, kind: str) -> str:
+        return self._get(kind).version
 
-    def _load_text_model(self):
-        if self._text_model is not None:
+    def errors(self) -> Dict[str, str]:
+        """Manifest-listed models that failed to load, by kind."""
+        return {kind: m.error for kind, m in list(self._models.items()) if m.error}
+
+    @property
+    def ready(self) -> bool:
+        """Warmed up, and no registered model failed to load."""
+        return self._warm and not self.errors()
+
+    def versions(self) -> Dict[str, str]:
+        return {kind: self.version(kind) for kind in KINDS}
+
+    def warmup(self) -> None:
+        """Load both models and run one prediction through each, so the first
+        real request doesn't pay for unpickling or first-call setup."""
+        start = time.perf_counter()
+        self.predict_text_batch(list(WARMUP_INPUTS["text"]))
+        self.predict_url_batch(list(WARMUP_INPUTS["url"]))
+        self._warm = True
+        logger.info(f"Models warm in {time.perf_counter() - start:.2f}s.")
+
+    def reload(self) -> Dict[str, str]:
+        """Swap in every model whose manifest entry changed and passes
+        validate_model(). Returns what happened per kind."""
+        with self._reload_lock:
+            manifest = model_registry.read_manifest()
+            outcome = {}
+            for kind in KINDS:
+                entry = model_registry.resolve(kind, manifest)
+                current = self._get(kind)
+                if current.entry == entry and current.model is not None:
+                    outcome[kind] = f"unchanged ({current.version})"
+                    continue
+                try:
+                    candidate = _load_model(entry)
+                    accuracy = validate_model(kind, candidate.model)
+                except Exception as ex:
+                    logger.error(f"Rejected {kind} model {entry.version}; still serving {current.version}: {ex}")
+                    outcome[kind] = f"rejected {entry.version}: {ex}"
+                    continue
+                self._models[kind] = candidate
+                metrics.set_model_version(kind, candidate.version, previous=current.version)
+                logger.info(f"Swapped {kind} model {current.version} -> {candidate.version} (smoke accuracy {accuracy:.2f}).")
+                outcome[kind] = f"{current.version} -> {candidate.version}"
+            return outcome
+
+    def start_reloader(self, interval_seconds: Optional[float] = None) -> None:
+        """Poll the manifest and reload() when it changes."""
+        interval = settings.model_reload_interval_seconds if interval_seconds is None else interval_seconds
+        if interval <= 0:
             return
-        path = settings.text_model_path
-        if os.path.exists(path):
-            self._text_model = joblib.load(path)
-            logger.info(f"Loaded text model: {path}")
-        else:
-            logger.warning(f"Text model not found at {path}. Using heuristic-only fallback.")
-            self._text_model = None
-
-    def _load_url_model(self):
-        if self._url_model is not None:
+        alive = self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid()
+        if alive:
             return
-        path = settings.url_model_path
-        if os.path.exists(path):
-            self._url_model = joblib.load(path)
-            logger.info(f"Loaded URL model: {path}")
-        else:
-            logger.warning(f"URL model not found at {path}. Using heuristic-only fallback.")
-            self._url_model = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, args=(interval,), name="model-reloader", daemon=True)
+        self._thread_pid = os.getpid()
+        self._thread.start()
+
+    def stop_reloader(self) -> None:
+        self._stop.set()
+
+    def _poll(self, interval: float) -> None:
+        seen = model_registry.manifest_signature()
+        while not self._stop.wait(interval):
+            signature = model_registry.manifest_signature()
+            if signature == seen:
+                continue
+            seen = signature
+            try:
+                self.reload()
+            except Exception as ex:
+                logger.warning(f"Model reload failed: {ex}")
 
     def predict_text(self, text: str):
-        self._load_text_model()
-        clean = normalize_text(text)
-        if self._text_model is None:
-            return {"prob_phish": 0.50, "confidence": 0.50, "model_version": "fallback"}
-        prob = float(self._text_model.predict_proba([clean])[0][1])
-        conf = float(max(prob, 1.0 - prob))
-        return {"prob_phish": prob, "confidence": conf, "model_version": MODEL_VERSION_TEXT}
+        return self.predict_text_batch([text])[0]
 
     def predict_url(self, url: str):
-        self._load_url_model()
-        feats = url_to_features(url)
-        if self._url_model is None:
-            return {"prob_phish": 0.50, "confidence": 0.50, "model_version": "fallback"}
-        prob = float(self._url_model.predict_proba([feats])[0][1])
-        conf = float(max(prob, 1.0 - prob))
-        return {"prob_phish": prob, "confidence": conf, "model_version": MODEL_VERSION_URL}
+        return self.predict_url_batch([url])[0]
+
+    def predict_text_batch(self, texts: List[str]):
+        return self.predict_normalized_text_batch([normalize_text(t) for t in texts])
+
+    def predict_normalized_text_batch(self, cleans: List[str]):
+        """Like predict_text_batch for inputs already passed through normalize_text."""
+        loaded = self._get("text")
+        if loaded.model is None:
+            return [_fallback_result() for _ in cleans]
+        return [_result(float(p), loaded.version) for p in _text_probs(loaded.model, cleans)]
+
+    def predict_url_batch(self, urls: List[str]):
+        loaded = self._get("url")
+        if loaded.model is None:
+            return [_fallback_result() for _ in urls]
+        return [_result(float(p), loaded.version) for p in _url_probs(loaded.model, urls)]
+
+def _result(prob: float, model_version: str):
+    conf = float(max(prob, 1.0 - prob))
+    return {"prob_phish": prob, "confidence": conf, "model_version": model_version}
+
+def _fallback_result():
+    return {"prob_phish": 0.50, "confidence": 0.50, "model_version": "fallback"}
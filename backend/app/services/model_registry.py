@@ -0,0 +1,129 @@
+"""Versioned model artifacts.
+
+MODEL_MANIFEST_PATH (default ml/artifacts/manifest.json) names the artifact
+serving each model kind and the version reported as `model_version`:
+
+    {"text": {"version": "text-v2", "path": "text/text-v2.joblib", "sha256": "..."},
+     "url": {"version": "url-v1", "path": "url_model.joblib", "sha256": "..."}}
+
+Paths are relative to the manifest's directory. A kind missing from the
+manifest falls back to the deprecated TEXT_MODEL_PATH / URL_MODEL_PATH as
+"<kind>-v1"; for a kind the manifest lists they are ignored.
+`python -m app.cli register-model` copies an artifact in and rewrites the
+manifest atomically; workers pick the change up with MLInference.reload().
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+
+KINDS = ("text", "url")
+_VERSION = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+@dataclass(frozen=True)
+class ModelEntry:
+    kind: str
+    version: str
+    path: Path
+    sha256: Optional[str] = None
+
+def sha256_file(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def manifest_signature(path: Optional[str] = None) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path or settings.model_manifest_path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def read_manifest(path: Optional[str] = None) -> Dict[str, ModelEntry]:
+    manifest = Path(path or settings.model_manifest_path)
+    if not manifest.exists():
+        return {}
+    data = json.loads(manifest.read_text(encoding="utf-8"))
+    return {
+        kind: ModelEntry(kind, str(e["version"]), manifest.parent / e["path"], e.get("sha256"))
+        for kind, e in data.items()
+        if kind in KINDS
+    }
+
+_warned_ignored = set()
+
+def resolve(kind: str, manifest: Dict[str, ModelEntry]) -> ModelEntry:
+    field = f"{kind}_model_path"
+    entry = manifest.get(kind)
+    if entry is not None:
+        if field in settings.model_fields_set and kind not in _warned_ignored:
+            _warned_ignored.add(kind)
+            logger.warning(f"{field.upper()} is deprecated and ignored: the model manifest lists a {kind} model.")
+        return entry
+    return ModelEntry(kind, f"{kind}-v1", Path(getattr(settings, field)))
+
+def load_smoke_set(kind: str) -> Tuple[List[str], List[int], float]:
+    """(inputs, labels, min_accuracy) a candidate model must pass before it
+    is swapped in; empty when MODEL_SMOKE_SET_PATH doesn't exist."""
+    path = Path(settings.model_smoke_set_path)
+    if not path.exists():
+        return [], [], 0.0
+    data = json.loads(path.read_text(encoding="utf-8"))
+    cases = data.get(kind, [])
+    return [c["input"] for c in cases], [int(c["label"]) for c in cases], float(data.get("min_accuracy", 0.0))
+
+def _umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+def _write_atomic(target: Path, write) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            # mkstemp creates 0600; give the file the mode a plain open()
+            # would, so a server running as another user can still read it.
+            os.fchmod(f.fileno(), 0o666 & ~_umask())
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def register(kind: str, artifact: str, version: str, manifest_path: Optional[str] = None) -> ModelEntry:
+    """Copy `artifact` to <manifest dir>/<kind>/<version>.joblib and make it
+    the manifest's current `kind` model. Versions are immutable: registering
+    an existing version with different contents is an error."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown model kind {kind!r}; expected one of {', '.join(KINDS)}")
+    if not _VERSION.match(version):
+        raise ValueError(f"Invalid model version {version!r}")
+    manifest = Path(manifest_path or settings.model_manifest_path)
+    root = manifest.parent
+    target = root / kind / f"{version}.joblib"
+    digest = sha256_file(artifact)
+
+    if target.exists():
+        if sha256_file(target) != digest:
+            raise ValueError(f"{kind} model {version} is already registered with different contents")
+    else:
+        with open(artifact, "rb") as src:
+            _write_atomic(target, lambda f: shutil.copyfileobj(src, f))
+
+    data = json.loads(manifest.read_text(encoding="utf-8")) if manifest.exists() else {}
+    data[kind] = {"version": version, "path": target.relative_to(root).as_posix(), "sha256": digest}
+    payload = (json.dumps(data, indent=2, sort_keys=True) + "\n").encode("utf-8")
+    _write_atomic(manifest, lambda f: f.write(payload))
+    return ModelEntry(kind, version, target, digest)
@@ -1,205 +1,171 @@
 import hashlib
+import time
+from datetime import datetime
+from typing import List, Tuple
 from uuid import uuid4
 from sqlalchemy.orm import Session
 
-from app.models.analysis import Analysis, AnalysisSignal
+from app.core import metrics
+
 from app.services.ml_inference import MLInference
 from app.services.intel import IntelLayer
 from app.services.risk import RiskScorer
 from app.services.explain import Explainer
 from app.services.cache import CacheStore
+from app.services.persistence import AnalysisWriter
+from app.services.pipeline import Pipeline
 
+cache = CacheStore()
 ml = MLInference()
-intel = IntelLayer()
+intel = IntelLayer(cache=cache)
 risk = RiskScorer()
 explain = Explainer()
-cache = CacheStore()
+writer = AnalysisWriter()
+pipeline = Pipeline(ml, intel, risk, explain)
+
+CACHE_TTL_SECONDS = 6 * 3600
 
 def _hash_input(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
 
-def analyze_text_payload(db: Session, kind: str, raw_text: str, user_visible_text: str):
-    analysis_id = uuid4().hex
-    input_hash = _hash_input(raw_text)
-
-    cache_key = f"text:{kind}:{input_hash}"
-    cached = cache.get_json(cache_key)
-    if cached:
-        ml_result = cached["ml_result"]
-        intel_result = cached["intel_result"]
-        score = cached["risk_score"]
-        level = cached["risk_level"]
-        reasons = cached["reasons"]
-        actions = cached["recommended_actions"]
-    else:
-        ml_result = ml.predict_text(raw_text)
-        intel_result = intel.inspect_text(user_visible_text)
-
-        score, level = risk.score(
-            p_ml=ml_result["prob_phish"],
-            h=float(intel_result["heuristic_score"]),
-            t=float(intel_result["intel_score"]),
-        )
-
-        reasons, actions, _ = explain.explain_text(
-            text=user_visible_text,
-            ml_prob=ml_result["prob_phish"],
-            intel=intel_result,
-            level=level
-        )
-
-        cache.set_json(
-            cache_key,
-            {
-                "ml_result": ml_result,
-                "intel_result": intel_result,
-                "risk_score": score,
-                "risk_level": level,
-                "reasons": reasons,
-                "recommended_actions": actions,
-            },
-            ttl_seconds=6 * 3600,
-        )
-
-    a = Analysis(
-        id=analysis_id,
-        type=kind,
-        input_hash=input_hash,
-        risk_score=score,
-        risk_level=level,
-        ml_prob=float(ml_result["prob_phish"]),
-        ml_confidence=float(ml_result["confidence"]),
-        model_version=ml_result["model_version"],
-        raw_excerpt=(user_visible_text[:800] if user_visible_text else None),
-    )
-    db.add(a)
-    db.flush()
-
-    def add_signal(k, v):
-        db.add(AnalysisSignal(analysis_id=analysis_id, key=str(k), value=str(v)))
+def _cached_or_compute(kind: str, keys: List[str], inputs: list, compute) -> List[dict]:
+    """Resolve one verdict per key, computing distinct misses in one batch.
+    Results are returned in input order. Time not spent in compute() (cache
+    reads and writes, waiting on identical in-flight requests) is recorded as
+    the "cache" stage."""
+    first_input = {}
+    for key, item in zip(keys, inputs):
+        first_input.setdefault(key, item)
+    computing = 0.0
+
+    def run(missing):
+        nonlocal computing
+        start = time.perf_counter()
+        try:
+            return compute([first_input[k] for k in missing])
+        finally:
+            computing += time.perf_counter() - start
+
+    start = time.perf_counter()
+    verdicts = cache.get_or_compute_many(keys, run, ttl_seconds=CACHE_TTL_SECONDS)
+    metrics.STAGE_SECONDS.labels(kind, "cache").observe(time.perf_counter() - start - computing)
+    for verdict in verdicts:
+        metrics.VERDICTS.labels(kind, verdict["risk_level"], verdict["ml_result"]["model_version"]).inc()
+    return verdicts
+
+def _record(kind: str, input_hash: str, verdict: dict, excerpt, signals: dict) -> dict:
+    ml_result = verdict["ml_result"]
+    return {
+        "id": uuid4().hex,
+        "type": kind,
+        "input_hash": input_hash,
+        "risk_score": verdict["risk_score"],
+        "risk_level": verdict["risk_level"],
+        "ml_prob": float(ml_result["prob_phish"]),
+        "ml_confidence": float(ml_result["confidence"]),
+        "model_version": ml_result["model_version"],
+        "created_at": datetime.utcnow(),
+        "raw_excerpt": excerpt,
+        "signals": signals,
+    }
 
-    add_signal("heuristic_score", intel_result["heuristic_score"])
-    add_signal("intel_score", intel_result["intel_score"])
-    add_signal("urls_found", ",".join(intel_result["urls_found"]))
-    add_signal("shortener", intel_result["shortener"])
-    add_signal("reputation_hit", intel_result["reputation_hit"])
+def _text_signals(intel_result: dict) -> dict:
+    signals = {
+        "heuristic_score": intel_result["heuristic_score"],
+        "intel_score": intel_result["intel_score"],
+        "urls_found": list(intel_result["urls_found"]),
+        "shortener": intel_result["shortener"],
+        "reputation_hit": intel_result["reputation_hit"],
+    }
     if intel_result.get("domain_age_days") is not None:
-        add_signal("domain_age_days", intel_result["domain_age_days"])
-
-    db.commit()
+        signals["domain_age_days"] = intel_result["domain_age_days"]
+    return signals
+
+def _url_signals(intel_result: dict) -> dict:
+    signals = {
+        "heuristic_score": intel_result["heuristic_score"],
+        "intel_score": intel_result["intel_score"],
+        "shortener": intel_result["shortener"],
+        "reputation_hit": intel_result["reputation_hit"],
+        "url_length": intel_result["url_length"],
+        "dot_count": intel_result["dot_count"],
+        "has_ip": intel_result["has_ip"],
+    }
+    if intel_result.get("domain_age_days") is not None:
+        signals["domain_age_days"] = intel_result["domain_age_days"]
+    return signals
 
+def _response(kind: str, analysis_id: str, verdict: dict, urls_found: List[str]) -> dict:
+    ml_result = verdict["ml_result"]
+    intel_result = verdict["intel_result"]
     return {
         "type": kind,
-        "risk_score": score,
-        "risk_level": level,
+        "risk_score": verdict["risk_score"],
+        "risk_level": verdict["risk_level"],
         "ml": {
             "prob_phish": ml_result["prob_phish"],
             "confidence": ml_result["confidence"],
             "model_version": ml_result["model_version"],
         },
         "intel": {
-            "urls_found": intel_result["urls_found"],
+            "urls_found": urls_found,
             "shortener": intel_result["shortener"],
             "domain_age_days": intel_result.get("domain_age_days"),
             "reputation_hit": intel_result["reputation_hit"],
             "redirects": intel_result.get("redirects", []),
             "notes": intel_result.get("notes", {}),
         },
-        "reasons": reasons,
-        "recommended_actions": actions,
+        "reasons": verdict["reasons"],
+        "recommended_actions": verdict["recommended_actions"],
         "analysis_id": analysis_id,
     }
 
-def analyze_url_payload(db: Session, url: str):
-    analysis_id = uuid4().hex
-    input_hash = _hash_input(url)
-
-    cache_key = f"url:{input_hash}"
-    cached = cache.get_json(cache_key)
-    if cached:
-        ml_result = cached["ml_result"]
-        intel_result = cached["intel_result"]
-        score = cached["risk_score"]
-        level = cached["risk_level"]
-        reasons = cached["reasons"]
-        actions = cached["recommended_actions"]
-    else:
-        ml_result = ml.predict_url(url)
-        intel_result = intel.inspect_url(url)
-
-        score, level = risk.score(
-            p_ml=ml_result["prob_phish"],
-            h=float(intel_result["heuristic_score"]),
-            t=float(intel_result["intel_score"]),
-        )
-
-        reasons, actions = explain.explain_url(
-            url=url,
-            ml_prob=ml_result["prob_phish"],
-            intel=intel_result,
-            level=level
-        )
+def analyze_text_batch_payload(db: Session, kind: str, items: List[Tuple[str, str]], persist: bool = True):
+    """Analyze (raw_text, user_visible_text) pairs with one model call, one
+    cache round-trip and one bulk write (skipped when not `persist`)."""
+    start = time.perf_counter()
+    hashes = [_hash_input(raw_text) for raw_text, _ in items]
+    verdicts = _cached_or_compute(
+        kind,
+        [f"text:{ml.version('text')}:{kind}:{h}" for h in hashes],
+        items,
+        lambda missing: pipeline.compute_text(missing, kind),
+    )
 
-        cache.set_json(
-            cache_key,
-            {
-                "ml_result": ml_result,
-                "intel_result": intel_result,
-                "risk_score": score,
-                "risk_level": level,
-                "reasons": reasons,
-                "recommended_actions": actions,
-            },
-            ttl_seconds=6 * 3600,
+    records = [
+        _record(
+            kind, input_hash, verdict,
+            excerpt=(user_visible_text[:800] if user_visible_text else None),
+            signals=_text_signals(verdict["intel_result"]),
         )
+        for (_, user_visible_text), input_hash, verdict in zip(items, hashes, verdicts)
+    ]
+    if persist:
+        writer.submit(db, records)
+
+    metrics.ANALYSIS_SECONDS.labels(kind).observe(time.perf_counter() - start)
+    return [
+        _response(kind, r["id"], verdict, verdict["intel_result"]["urls_found"])
+        for r, verdict in zip(records, verdicts)
+    ]
+
+def analyze_url_batch_payload(db: Session, urls: List[str], persist: bool = True):
+    start = time.perf_counter()
+    hashes = [_hash_input(url) for url in urls]
+    verdicts = _cached_or_compute("url", [f"url:{ml.version('url')}:{h}" for h in hashes], urls, pipeline.compute_url)
+
+    records = [
+        _record("url", input_hash, verdict, excerpt=url[:800], signals=_url_signals(verdict["intel_result"]))
+        for url, input_hash, verdict in zip(urls, hashes, verdicts)
+    ]
+    if persist:
+        writer.submit(db, records)
+
+    metrics.ANALYSIS_SECONDS.labels("url").observe(time.perf_counter() - start)
+    return [_response("url", r["id"], verdict, [url]) for r, url, verdict in zip(records, urls, verdicts)]
 
-    a = Analysis(
-        id=analysis_id,
-        type="url",
-        input_hash=input_hash,
-        risk_score=score,
-        risk_level=level,
-        ml_prob=float(ml_result["prob_phish"]),
-        ml_confidence=float(ml_result["confidence"]),
-        model_version=ml_result["model_version"],
-        raw_excerpt=url[:800],
-    )
-    db.add(a)
-    db.flush()
-
-    def add_signal(k, v):
-        db.add(AnalysisSignal(analysis_id=analysis_id, key=str(k), value=str(v)))
-
-    add_signal("heuristic_score", intel_result["heuristic_score"])
-    add_signal("intel_score", intel_result["intel_score"])
-    add_signal("shortener", intel_result["shortener"])
-    add_signal("reputation_hit", intel_result["reputation_hit"])
-    add_signal("url_length", intel_result["url_length"])
-    add_signal("dot_count", intel_result["dot_count"])
-    add_signal("has_ip", intel_result["has_ip"])
-    if intel_result.get("domain_age_days") is not None:
-        add_signal("domain_age_days", intel_result["domain_age_days"])
-
-    db.commit()
+def analyze_text_payload(db: Session, kind: str, raw_text: str, user_visible_text: str):
+    return analyze_text_batch_payload(db, kind, [(raw_text, user_visible_text)])[0]
 
-    return {
-        "type": "url",
-        "risk_score": score,
-        "risk_level": level,
-        "ml": {
-            "prob_phish": ml_result["prob_phish"],
-            "confidence": ml_result["confidence"],
-            "model_version": ml_result["model_version"],
-        },
-        "intel": {
-            "urls_found": [url],
-            "shortener": intel_result["shortener"],
-            "domain_age_days": intel_result.get("domain_age_days"),
-            "reputation_hit": intel_result["reputation_hit"],
-            "redirects": intel_result.get("redirects", []),
-            "notes": intel_result.get("notes", {}),
-        },
-        "reasons": reasons,
-        "recommended_actions": actions,
-        "analysis_id": analysis_id,
-    }
+def analyze_url_payload(db: Session, url: str):
+    return analyze_url_batch_payload(db, [url])[0]
@@ -0,0 +1,166 @@
+from __future__ import annotations
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.logging import logger
+from app.models.analysis import Analysis
+from app.services import rollups
+
+_STOP = object()
+
+def insert_records(db: Session, records: List[dict]) -> None:
+    """Bulk-insert analysis records (Analysis column dicts) with one
+    executemany and fold them into the stats rollups. The caller commits."""
+    if not records:
+        return
+    db.execute(insert(Analysis), records)
+    rollups.add_records(db, records)
+
+def _write(db: Session, records: List[dict], kind: str) -> None:
+    """insert_records() and commit, timed as the db_flush and db_commit stages
+    of `kind` ("write_behind" for the background writer's batches)."""
+    with metrics.stage(kind, "db_flush"):
+        insert_records(db, records)
+    with metrics.stage(kind, "db_commit"):
+        db.commit()
+
+class AnalysisWriter:
+    """Writes analysis records, synchronously or write-behind.
+
+    With WRITE_BEHIND_ENABLED the request path only enqueues records on a
+    bounded in-memory queue; a background thread bulk-inserts them in batches
+    of up to WRITE_BEHIND_BATCH_SIZE, at least every
+    WRITE_BEHIND_FLUSH_INTERVAL_SECONDS. When the queue is full, or the writer
+    isn't running, records are written synchronously on the caller's session.
+    close() drains the queue before returning.
+    """
+
+    def __init__(self):
+        self.enabled = settings.write_behind_enabled
+        self.batch_size = settings.write_behind_batch_size
+        self.flush_interval = settings.write_behind_flush_interval_seconds
+        self._queue: "queue.Queue" = queue.Queue(maxsize=settings.write_behind_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {"queued": 0, "written": 0, "sync_fallbacks": 0, "dropped": 0}
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        return {"enabled": self.enabled, "running": self.running, "backlog": self._queue.qsize(), **counts}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._closing
+
+    def start(self) -> None:
+        if not self.enabled or self.running:
+            return
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="analysis-writer", daemon=True)
+        self._thread.start()
+        logger.info("Write-behind persistence enabled.")
+
+    def submit(self, db: Session, records: List[dict]) -> None:
+        if self.running:
+            for i, record in enumerate(records):
+                try:
+                    self._queue.put_nowait(record)
+                except queue.Full:
+                    records = records[i:]
+                    self._count("sync_fallbacks", len(records))
+                    break
+                self._count("queued")
+            else:
+                return
+        if records:
+            _write(db, records, records[0]["type"])
+
+    def _collect(self, first):
+        """Gather a batch: up to batch_size records or flush_interval after
+        the first one, whichever comes first. Returns (batch, stop_seen)."""
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _take_all(self) -> List[dict]:
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is not _STOP:
+                items.append(item)
+
+    def _flush(self, batch: List[dict]) -> None:
+        for attempt in range(3):
+            db = SessionLocal()
+            try:
+                _write(db, batch, "write_behind")
+                self._count("written", len(batch))
+                return
+            except Exception as ex:
+                db.rollback()
+                logger.warning(f"Write-behind flush of {len(batch)} analyses failed (attempt {attempt + 1}): {ex}")
+                time.sleep(0.5 * (attempt + 1))
+            finally:
+                db.close()
+        self._count("dropped", len(batch))
+        logger.error(f"Dropped {len(batch)} analyses after repeated write failures.")
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if first is _STOP:
+                break
+            batch, stopping = self._collect(first)
+            self._flush(batch)
+        self._flush_all(self._take_all())
+
+    def _flush_all(self, records: List[dict]) -> None:
+        for i in range(0, len(records), self.batch_size):
+            self._flush(records[i:i + self.batch_size])
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Flush everything queued so far and stop the worker."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._closing = True
+        self._queue.put(_STOP, timeout=timeout)
+        thread.join(timeout=timeout)
+        if thread.is_alive():
+            logger.error(f"Write-behind worker did not finish within {timeout}s; {self._queue.qsize()} analyses unwritten.")
+            return
+        self._thread = None
+        # Anything enqueued while the worker was exiting.
+        self._flush_all(self._take_all())
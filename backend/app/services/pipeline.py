@@ -0,0 +1,92 @@
+from __future__ import annotations
+from typing import List, Tuple
+
+from app.core import metrics
+from app.services.context import AnalysisContext
+from app.services.explain import Explainer
+from app.services.intel import IntelLayer
+from app.services.ml_inference import MLInference
+from app.services.risk import RiskScorer
+
+class Pipeline:
+    """The analysis stages for a batch of inputs: model, intel, risk score
+    and explanation. No caching or persistence; the orchestrator adds those,
+    the offline scanner runs it directly."""
+
+    def __init__(self, ml: MLInference, intel: IntelLayer, risk: RiskScorer, explain: Explainer):
+        self.ml = ml
+        self.intel = intel
+        self.risk = risk
+        self.explain = explain
+
+    def _score(self, ml_results: List[dict], intel_results: List[dict]):
+        return self.risk.score_batch([
+            (m["prob_phish"], float(i["heuristic_score"]), float(i["intel_score"]))
+            for m, i in zip(ml_results, intel_results)
+        ])
+
+    def compute_text(self, items: List[Tuple[str, str]], kind: str = "sms") -> List[dict]:
+        """Verdicts for (raw_text, user_visible_text) pairs, in input order.
+        `kind` only labels the stage timings."""
+        contexts = [AnalysisContext(raw_text, user_visible_text) for raw_text, user_visible_text in items]
+        with metrics.stage(kind, "rules"):
+            for ctx in contexts:
+                ctx.prime()
+        with metrics.stage(kind, "ml"):
+            ml_results = self.ml.predict_normalized_text_batch([ctx.clean_raw for ctx in contexts])
+        with metrics.stage(kind, "rdap"):
+            # Every link inspect_context may look up: it skips domainless
+            # links and tries later ones while the age is still unknown.
+            self.intel.prefetch_domains(link.domain for ctx in contexts for link in ctx.links if link.domain)
+        with metrics.stage(kind, "intel"):
+            intel_results = [self.intel.inspect_context(ctx) for ctx in contexts]
+        with metrics.stage(kind, "risk"):
+            scores = self._score(ml_results, intel_results)
+
+        computed = []
+        with metrics.stage(kind, "explain"):
+            for ctx, ml_result, intel_result, (score, level) in zip(contexts, ml_results, intel_results, scores):
+                reasons, actions, _ = self.explain.explain_context(
+                    ctx=ctx,
+                    ml_prob=ml_result["prob_phish"],
+                    intel=intel_result,
+                    level=level
+                )
+                computed.append({
+                    "ml_result": ml_result,
+                    "intel_result": intel_result,
+                    "risk_score": score,
+                    "risk_level": level,
+                    "reasons": reasons,
+                    "recommended_actions": actions,
+                })
+        return computed
+
+    def compute_url(self, urls: List[str]) -> List[dict]:
+        with metrics.stage("url", "ml"):
+            ml_results = self.ml.predict_url_batch(urls)
+        with metrics.stage("url", "rdap"):
+            self.intel.prefetch_domains(self.intel.registrable_domain(url) for url in urls)
+        with metrics.stage("url", "intel"):
+            intel_results = [self.intel.inspect_url(url) for url in urls]
+        with metrics.stage("url", "risk"):
+            scores = self._score(ml_results, intel_results)
+
+        computed = []
+        with metrics.stage("url", "explain"):
+            for url, ml_result, intel_result, (score, level) in zip(urls, ml_results, intel_results, scores):
+                reasons, actions = self.explain.explain_url(
+                    url=url,
+                    ml_prob=ml_result["prob_phish"],
+                    intel=intel_result,
+                    level=level
+                )
+                computed.append({
+                    "ml_result": ml_result,
+                    "intel_result": intel_result,
+                    "risk_score": score,
+                    "risk_level": level,
+                    "reasons": reasons,
+                    "recommended_actions": actions,
+                })
+        return computed
@@ -0,0 +1,167 @@
+from __future__ import annotations
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+from urllib.parse import urljoin
+
+import httpx
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import logger
+
+REGISTRATION_EVENTS = ("registration", "registered", "creation")
+MAX_REDIRECTS = 3
+
+def registration_date(data: dict) -> Optional[datetime]:
+    for e in data.get("events", []):
+        if e.get("eventAction") in REGISTRATION_EVENTS and e.get("eventDate"):
+            return datetime.fromisoformat(e["eventDate"].replace("Z", "+00:00"))
+    return None
+
+def age_days(created: Optional[datetime]) -> Optional[int]:
+    if created is None:
+        return None
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    now = datetime.now(timezone.utc)
+    return max(0, int((now - created).total_seconds() // 86400))
+
+class RDAPClient:
+    """Long-lived, pooled RDAP client shared by every request thread.
+
+    Lookups run on a private event loop thread with one keep-alive
+    httpx.AsyncClient. Concurrent lookups for the same domain share a single
+    request, and each RDAP server host (rdap.org and the registry servers it
+    redirects to) gets at most `max_per_host` requests in flight. Sync callers
+    block only on their own lookup, bounded by `timeout`, but they do block:
+    a request thread calling registration_dates() is held for up to
+    `timeout` per batch. Async code should await registration_date_async()
+    on the client's loop instead.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_per_host: Optional[int] = None,
+    ):
+        self.base_url = (base_url or settings.rdap_base_url).rstrip("/")
+        self.timeout = timeout if timeout is not None else settings.rdap_timeout_seconds
+        self.max_connections = max_connections or settings.rdap_max_connections
+        self.max_per_host = max_per_host or settings.rdap_max_per_host
+
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        # Only touched from the loop thread.
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # A forked worker inherits the object but not the loop thread.
+            if self._loop is not None and self._pid == os.getpid():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="rdap-client", daemon=True)
+            thread.start()
+            self._loop, self._thread, self._pid = loop, thread, os.getpid()
+            self._client = None
+            self._inflight, self._host_slots = {}, {}
+            return loop
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"Accept": "application/rdap+json"},
+            )
+        return self._client
+
+    @asynccontextmanager
+    async def _host_slot(self, host: str):
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        async with slot:
+            yield
+
+    async def _fetch(self, domain: str) -> Optional[datetime]:
+        client = self._get_client()
+        url = f"{self.base_url}/domain/{domain}"
+        for _ in range(MAX_REDIRECTS + 1):
+            async with self._host_slot(httpx.URL(url).host):
+                r = await client.get(url)
+            if r.is_redirect and r.headers.get("location"):
+                url = urljoin(url, r.headers["location"])
+                continue
+            if r.status_code == 429 or r.status_code >= 500:
+                # Counted and logged as a failed lookup, unlike a 404.
+                r.raise_for_status()
+            if r.status_code != 200:
+                return None
+            return registration_date(r.json())
+        return None
+
+    async def _lookup(self, domain: str) -> Optional[datetime]:
+        try:
+            created = await asyncio.wait_for(self._fetch(domain), self.timeout)
+        except Exception as ex:
+            metrics.RDAP_LOOKUPS.labels("failed").inc()
+            logger.info(f"RDAP lookup failed for {domain}: {ex!r}")
+            return None
+        metrics.RDAP_LOOKUPS.labels("found" if created else "no_date").inc()
+        return created
+
+    async def registration_date_async(self, domain: str) -> Optional[datetime]:
+        """Must run on this client's loop (see `registration_dates`)."""
+        domain = domain.lower()
+        task = self._inflight.get(domain)
+        if task is None:
+            task = asyncio.ensure_future(self._lookup(domain))
+            self._inflight[domain] = task
+            task.add_done_callback(lambda _: self._inflight.pop(domain, None))
+        return await asyncio.shield(task)
+
+    async def _gather(self, domains):
+        return await asyncio.gather(*(self.registration_date_async(d) for d in domains))
+
+    def registration_dates(self, domains: Iterable[str]) -> Dict[str, Optional[datetime]]:
+        """Look up several domains concurrently; failures map to None.
+        Blocks the calling thread until all are done, up to `timeout`."""
+        domains = list(dict.fromkeys(d.lower() for d in domains if d))
+        if not domains:
+            return {}
+        future = asyncio.run_coroutine_threadsafe(self._gather(domains), self._ensure_loop())
+        return dict(zip(domains, future.result()))
+
+    def registration_date(self, domain: str) -> Optional[datetime]:
+        if not domain:
+            return None
+        return self.registration_dates([domain]).get(domain.lower())
+
+    def domain_age_days(self, domain: str) -> Optional[int]:
+        return age_days(self.registration_date(domain))
+
+    def close(self) -> None:
+        with self._lock:
+            loop, thread, client = self._loop, self._thread, self._client
+            self._loop = self._thread = self._client = None
+        if loop is None or self._pid != os.getpid():
+            return
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
@@ -1,4 +1,7 @@
 import math
+from typing import List, Tuple
+
+import numpy as np
 
 class RiskScorer:
     def __init__(self, alpha=1.2, beta=1.0, gamma=1.4, bias=0.0):
@@ -21,13 +24,25 @@ class RiskScorer:
         x = (self.alpha * self._logit(p_ml)) + (self.beta * h) + (self.gamma * t) + self.bias
         s = int(round(100 * self._sigmoid(x)))
         s = max(0, min(100, s))
+        return s, self._level(s)
+
+    def score_batch(self, rows: List[Tuple[float, float, float]]):
+        """Vectorized score() over (p_ml, h, t) rows; results keep input order."""
+        if not rows:
+            return []
+        arr = np.asarray(rows, dtype=float).reshape(-1, 3)
+        eps = 1e-6
+        p = np.clip(arr[:, 0], eps, 1 - eps)
+        x = (self.alpha * np.log(p / (1 - p))) + (self.beta * arr[:, 1]) + (self.gamma * arr[:, 2]) + self.bias
+        s = np.clip(np.round(100.0 / (1.0 + np.exp(-x))), 0, 100).astype(int)
+        return [(int(v), self._level(int(v))) for v in s]
 
+    @staticmethod
+    def _level(s: int) -> str:
         if s <= 24:
-            level = "LOW"
+            return "LOW"
         elif s <= 49:
-            level = "MEDIUM"
+            return "MEDIUM"
         elif s <= 74:
-            level = "HIGH"
-        else:
-            level = "CRITICAL"
-        return s, level
+            return "HIGH"
+        return "CRITICAL"
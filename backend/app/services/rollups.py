@@ -0,0 +1,173 @@
+from __future__ import annotations
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Table, delete, func, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from app.models.analysis import Analysis
+from app.models.stats import StatsCounter, StatsHourly
+
+INTERVALS = ("hour", "day", "week", "month")
+
+def _upsert_add(db: Session, table: Table, keys: Tuple[str, ...], rows: List[dict]) -> None:
+    """Insert rows, or add their non-key columns onto the existing row."""
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    sums = [c for c in rows[0] if c not in keys]
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={c: table.c[c] + stmt.excluded[c] for c in sums},
+        )
+        db.execute(stmt, rows)
+        return
+    for row in rows:
+        match = [table.c[k] == row[k] for k in keys]
+        updated = db.execute(
+            update(table).where(*match).values({c: table.c[c] + row[c] for c in sums})
+        ).rowcount
+        if not updated:
+            db.execute(insert(table).values(**row))
+
+def counter_rows(records: List[dict]) -> List[dict]:
+    counts: Counter = Counter()
+    for r in records:
+        counts[("total", "")] += 1
+        counts[("type", r["type"])] += 1
+        counts[("level", r["risk_level"])] += 1
+    # Sorted so concurrent writers take row locks in the same order.
+    return [{"dimension": d, "value": v, "count": n} for (d, v), n in sorted(counts.items())]
+
+def hour_of(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+def hourly_rows(records) -> List[dict]:
+    """Hourly buckets from (created_at, type, risk_level, risk_score) tuples."""
+    buckets: Dict[tuple, List[int]] = {}
+    for created_at, kind, level, score in records:
+        agg = buckets.setdefault((hour_of(created_at), kind, level), [0, 0])
+        agg[0] += 1
+        agg[1] += int(score)
+    return [
+        {"bucket_start": b, "type": t, "risk_level": lvl, "count": n, "score_sum": total}
+        for (b, t, lvl), (n, total) in sorted(buckets.items())
+    ]
+
+def add_records(db: Session, records: List[dict]) -> None:
+    """Fold freshly inserted analysis records into the rollups, in the
+    caller's transaction."""
+    _upsert_add(db, StatsCounter.__table__, ("dimension", "value"), counter_rows(records))
+    _upsert_add(
+        db, StatsHourly.__table__, ("bucket_start", "type", "risk_level"),
+        hourly_rows((r["created_at"], r["type"], r["risk_level"], r["risk_score"]) for r in records),
+    )
+
+def read_counters(db: Session) -> Dict[str, Dict[str, int]]:
+    out: Dict[str, Dict[str, int]] = {"total": {}, "type": {}, "level": {}}
+    for dimension, value, count in db.execute(
+        select(StatsCounter.dimension, StatsCounter.value, StatsCounter.count)
+        .order_by(StatsCounter.dimension, StatsCounter.value)
+    ):
+        out.setdefault(dimension, {})[value] = int(count)
+    return out
+
+def _lock_analyses(db: Session) -> None:
+    """Hold off inserts into `analyses` until the caller commits, so a
+    rebuild neither misses nor double-counts rows written meanwhile. SQLite
+    serializes writers anyway."""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"LOCK TABLE {Analysis.__tablename__} IN SHARE MODE"))
+
+def rebuild_counters(db: Session) -> None:
+    """Recompute the counters from `analyses` (one full scan). The caller
+    commits; inserts wait until then."""
+    _lock_analyses(db)
+    rows = [{"dimension": "total", "value": "", "count": db.query(func.count(Analysis.id)).scalar() or 0}]
+    for dimension, column in (("type", Analysis.type), ("level", Analysis.risk_level)):
+        rows.extend(
+            {"dimension": dimension, "value": value, "count": count}
+            for value, count in db.query(column, func.count(Analysis.id)).group_by(column)
+        )
+    db.execute(delete(StatsCounter))
+    db.execute(insert(StatsCounter), rows)
+
+def rebuild_hourly(db: Session, chunk_size: int = 10000) -> None:
+    """Recompute the hourly buckets from `analyses`, streaming the rows
+    instead of grouping by a dialect-specific date_trunc. The caller commits;
+    inserts wait until then."""
+    _lock_analyses(db)
+    rows = db.execute(
+        select(Analysis.created_at, Analysis.type, Analysis.risk_level, Analysis.risk_score)
+        .where(Analysis.created_at.is_not(None))
+        .execution_options(yield_per=chunk_size)
+    )
+    buckets = hourly_rows(rows)
+    db.execute(delete(StatsHourly))
+    for i in range(0, len(buckets), chunk_size):
+        db.execute(insert(StatsHourly), buckets[i:i + chunk_size])
+
+def missing_rollups(db: Session) -> List[str]:
+    """Names of the rollup tables that are empty although `analyses` is not,
+    i.e. a database that predates them and needs `app.cli rebuild-stats`."""
+    if db.execute(select(Analysis.id).limit(1)).first() is None:
+        return []
+    return [
+        model.__tablename__
+        for model in (StatsCounter, StatsHourly)
+        if db.execute(select(model.count).limit(1)).first() is None
+    ]
+
+def _floor(ts: datetime, interval: str) -> datetime:
+    ts = hour_of(ts)
+    if interval == "hour":
+        return ts
+    ts = ts.replace(hour=0)
+    if interval == "week":
+        return ts - timedelta(days=ts.weekday())
+    if interval == "month":
+        return ts.replace(day=1)
+    return ts
+
+def timeseries(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    interval: str = "day",
+    kind: Optional[str] = None,
+    level: Optional[str] = None,
+) -> List[dict]:
+    """Counts and mean risk score per (interval bucket, type, level) for
+    analyses created in [start, end), from the hourly buckets. Weeks start on
+    Monday; all times are UTC."""
+    q = select(
+        StatsHourly.bucket_start, StatsHourly.type, StatsHourly.risk_level,
+        StatsHourly.count, StatsHourly.score_sum,
+    ).where(StatsHourly.bucket_start >= hour_of(start), StatsHourly.bucket_start < end)
+    if kind:
+        q = q.where(StatsHourly.type == kind)
+    if level:
+        q = q.where(StatsHourly.risk_level == level)
+
+    merged: Dict[tuple, List[int]] = {}
+    for bucket_start, t, lvl, count, score_sum in db.execute(q):
+        agg = merged.setdefault((_floor(bucket_start, interval), t, lvl), [0, 0])
+        agg[0] += count
+        agg[1] += score_sum
+    return [
+        {
+            "bucket_start": b.isoformat() + "Z",
+            "type": t,
+            "risk_level": lvl,
+            "count": n,
+            "mean_risk_score": round(total / n, 2) if n else None,
+        }
+        for (b, t, lvl), (n, total) in sorted(merged.items())
+    ]
@@ -0,0 +1,237 @@
+"""Offline rescoring of message and URL archives.
+
+Reads CSV or Parquet in chunks, scores each chunk in a pool of worker
+processes (each loads the models and blocklists once) and writes one verdict
+row per input row, in input order, to CSV, Parquet or NDJSON. Nothing is
+cached or stored: no database or Redis is involved. See `python -m app.cli
+scan --help`.
+"""
+from __future__ import annotations
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from app.core.logging import logger
+from app.services.context import email_raw_text
+from app.services.explain import Explainer
+from app.services.intel import IntelLayer
+from app.services.ml_inference import MLInference
+from app.services.pipeline import Pipeline
+from app.services.risk import RiskScorer
+from app.utils.url_features import check_url
+
+# Input columns per kind; the first is required.
+COLUMNS = {
+    "sms": ("text",),
+    "email": ("body", "subject", "sender", "headers_raw"),
+    "url": ("url",),
+}
+
+_pipeline: Optional[Pipeline] = None
+
+def _format(path: str) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    return "csv"
+
+def read_chunks(path: str, columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """`columns` (those present) of `path` as string DataFrames of up to
+    chunk_size rows; missing values become ""."""
+    if _format(path) == "parquet":
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path)
+        present = [c for c in columns if c in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=present):
+            yield batch.to_pandas().fillna("").astype(str)
+    else:
+        yield from pd.read_csv(
+            path,
+            usecols=lambda c: c in columns,
+            dtype=str,
+            keep_default_na=False,
+            chunksize=chunk_size,
+        )
+
+def _init_worker(network: bool) -> None:
+    global _pipeline
+    _pipeline = Pipeline(MLInference(), IntelLayer(cache=None, network=network), RiskScorer(), Explainer())
+
+def _require_models(ml: MLInference) -> None:
+    """Refuse to rescore with the heuristic fallback because a registered
+    model is broken."""
+    ml.versions()
+    errors = ml.errors()
+    if errors:
+        raise RuntimeError("model failed to load: " + "; ".join(f"{k} {e}" for k, e in errors.items()))
+
+VERDICT_COLUMNS = (
+    "risk_score", "risk_level", "ml_prob", "model_version", "heuristic_score", "intel_score",
+    "shortener", "reputation_hit", "domain_age_days", "reasons",
+)
+
+def _verdict_row(verdict: dict) -> dict:
+    ml_result = verdict["ml_result"]
+    intel_result = verdict["intel_result"]
+    return {
+        "risk_score": verdict["risk_score"],
+        "risk_level": verdict["risk_level"],
+        "ml_prob": ml_result["prob_phish"],
+        "model_version": ml_result["model_version"],
+        "heuristic_score": intel_result["heuristic_score"],
+        "intel_score": intel_result["intel_score"],
+        "shortener": intel_result["shortener"],
+        "reputation_hit": intel_result["reputation_hit"],
+        "domain_age_days": intel_result.get("domain_age_days"),
+        "reasons": "; ".join(verdict["reasons"]),
+        "error": None,
+    }
+
+def _error_row(message: str) -> dict:
+    return {**dict.fromkeys(VERDICT_COLUMNS), "error": message}
+
+def score_chunk(kind: str, rows: List[Dict[str, str]]) -> List[dict]:
+    """Verdict rows for `rows` (dicts of COLUMNS[kind]); identical inputs in
+    a chunk are scored once. Inputs that can't be scored (an unparseable URL,
+    or one that makes the pipeline fail) get a row with only `error` set."""
+    errors: Dict[int, str] = {}
+    if kind == "url":
+        inputs = [r["url"].strip() for r in rows]
+        for i, url in enumerate(inputs):
+            try:
+                check_url(url)
+            except ValueError as ex:
+                errors[i] = str(ex)
+        compute = _pipeline.compute_url
+    elif kind == "email":
+        inputs = [(email_raw_text(r["subject"], r["sender"], r["headers_raw"], r["body"]), r["body"]) for r in rows]
+        compute = lambda xs: _pipeline.compute_text(xs, "email")
+    else:
+        inputs = [(r["text"].strip(), r["text"].strip()) for r in rows]
+        compute = _pipeline.compute_text
+    unique = list(dict.fromkeys(x for i, x in enumerate(inputs) if i not in errors))
+    try:
+        verdicts = dict(zip(unique, (_verdict_row(v) for v in compute(unique))))
+    except Exception as ex:
+        logger.warning(f"Scoring a chunk of {len(unique)} {kind} inputs failed ({ex!r}); scoring them one by one.")
+        verdicts = {}
+        for x in unique:
+            try:
+                verdicts[x] = _verdict_row(compute([x])[0])
+            except Exception as row_ex:
+                verdicts[x] = _error_row(f"analysis failed: {row_ex}")
+    return [_error_row(errors[i]) if i in errors else verdicts[x] for i, x in enumerate(inputs)]
+
+def _score_frame(kind: str, frame: pd.DataFrame, id_column: Optional[str]) -> pd.DataFrame:
+    out = pd.DataFrame(score_chunk(kind, frame.to_dict("records")), index=frame.index)
+    # Nullable and explicitly typed, so every chunk has the same column types
+    # whether or not it has error rows.
+    out = out.astype({
+        "risk_score": "Int64", "domain_age_days": "Int64", "heuristic_score": "float64",
+        "intel_score": "float64", "ml_prob": "float64", "shortener": "boolean", "reputation_hit": "boolean",
+        "risk_level": "string", "model_version": "string", "reasons": "string", "error": "string",
+    })
+    if id_column:
+        out.insert(0, id_column, frame[id_column].to_numpy())
+    out.insert(0, "row", frame.index.to_numpy())
+    return out
+
+class _Writer:
+    def __init__(self, path: str):
+        self.path = path
+        self.format = _format(path)
+        self._parquet = None
+        self._csv_header = True
+        self._file = None if self.format == "parquet" else open(path, "w", encoding="utf-8", newline="")
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self.format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table.cast(self._parquet.schema))
+        elif self.format == "ndjson":
+            frame.to_json(self._file, orient="records", lines=True)
+        else:
+            frame.to_csv(self._file, index=False, header=self._csv_header)
+            self._csv_header = False
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._file is not None:
+            self._file.close()
+
+def scan(
+    kind: str,
+    src: str,
+    dst: str,
+    workers: Optional[int] = None,
+    chunk_size: int = 2000,
+    id_column: Optional[str] = None,
+    network: bool = True,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Dict[str, int]:
+    """Score every row of `src` into `dst`. Returns row counts per risk level,
+    with rows that couldn't be scored counted as ERROR. `progress`, if given,
+    is called with the number of rows written so far after each chunk."""
+    columns = list(COLUMNS[kind]) + ([id_column] if id_column else [])
+    workers = workers or os.cpu_count() or 1
+    levels: Dict[str, int] = {}
+    rows = 0
+
+    def chunks():
+        offset = 0
+        for frame in read_chunks(src, columns, chunk_size):
+            for c in [COLUMNS[kind][0]] + ([id_column] if id_column else []):
+                if c not in frame.columns:
+                    raise ValueError(f"{src} has no {c!r} column")
+            for c in COLUMNS[kind]:
+                if c not in frame.columns:
+                    frame[c] = ""
+            frame.index = pd.RangeIndex(offset, offset + len(frame))
+            offset += len(frame)
+            yield frame
+
+    writer = _Writer(dst)
+    pool = None
+    try:
+        if workers == 1:
+            _init_worker(network)
+            _require_models(_pipeline.ml)
+            results = (_score_frame(kind, frame, id_column) for frame in chunks())
+        else:
+            _require_models(MLInference())
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(network,))
+            results = _ordered(pool, kind, chunks(), id_column, in_flight=workers * 2)
+        for out in results:
+            writer.write(out)
+            rows += len(out)
+            for level, n in out["risk_level"].fillna("ERROR").value_counts().items():
+                levels[level] = levels.get(level, 0) + int(n)
+            if progress is not None:
+                progress(rows)
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return levels
+
+def _ordered(pool: ProcessPoolExecutor, kind: str, frames, id_column, in_flight: int):
+    """Results of _score_frame over `frames`, in order, with at most
+    `in_flight` chunks read ahead of the writer."""
+    pending = deque()
+    for frame in frames:
+        pending.append(pool.submit(_score_frame, kind, frame, id_column))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_left
+from typing import Iterable
+
+import numpy as np
+
+_MASK64 = (1 << 64) - 1
+
+def key_hash(key: str) -> int:
+    """64-bit hash of a key. Uses the interpreter's (SipHash) string hash, so
+    values are only comparable within one process; indexes are rebuilt per
+    process anyway."""
+    return hash(key) & _MASK64
+
+class BloomFilter:
+    """Blocked Bloom filter over 64-bit key hashes: each key sets 4 bits in a
+    single 64-bit word, so a check is one word read and a mask compare."""
+
+    def __init__(self, hashes: np.ndarray, bits_per_item: float = 10.0):
+        """`hashes`: uint64 array of key hashes."""
+        self._nwords = max(1, int(len(hashes) * bits_per_item) // 64)
+        m = hashes >> np.uint64(32)
+        mask = np.zeros(len(hashes), dtype=np.uint64)
+        for shift in (0, 6, 12, 18):
+            mask |= np.left_shift(np.uint64(1), (m >> np.uint64(shift)) & np.uint64(63))
+        words = np.zeros(self._nwords, dtype=np.uint64)
+        np.bitwise_or.at(words, (hashes & np.uint64(0xFFFFFFFF)) % np.uint64(self._nwords), mask)
+        self._words = array("Q", words.tobytes())
+
+    def _slot(self, h: int):
+        m = h >> 32
+        mask = (1 << (m & 63)) | (1 << ((m >> 6) & 63)) | (1 << ((m >> 12) & 63)) | (1 << ((m >> 18) & 63))
+        return (h & 0xFFFFFFFF) % self._nwords, mask
+
+    def might_contain(self, h: int) -> bool:
+        i, mask = self._slot(h)
+        return self._words[i] & mask == mask
+
+    @property
+    def nbytes(self) -> int:
+        return self._words.itemsize * self._nwords
+
+class HashIndex:
+    """Immutable set of strings stored as sorted 64-bit hashes.
+
+    Takes 8 bytes per entry plus a bucket directory (~4 bytes per 8 entries)
+    instead of a Python str per entry. A lookup hashes the key, jumps to its
+    bucket by the top hash bits and bisects a handful of entries. An optional
+    Bloom filter (`bloom_bits_per_item`) rejects most misses before that.
+    """
+
+    def __init__(self, keys: Iterable[str] = (), bloom_bits_per_item: float = 0):
+        hashes = np.unique(np.fromiter((key_hash(k) for k in keys), dtype=np.uint64))
+        n = len(hashes)
+        # ~8 entries per bucket.
+        self._bits = max(1, min(24, (n // 8).bit_length()))
+        self._shift = 64 - self._bits
+        bounds = np.arange(1 << self._bits, dtype=np.uint64) << np.uint64(self._shift)
+        offsets = np.append(np.searchsorted(hashes, bounds), n).astype(np.uint32)
+        self._keys = array("Q", hashes.tobytes())
+        self._offsets = array("I", offsets.tobytes())
+        self.bloom = BloomFilter(hashes, bloom_bits_per_item) if bloom_bits_per_item and n else None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def contains_hash(self, h: int) -> bool:
+        if self.bloom is not None and not self.bloom.might_contain(h):
+            return False
+        b = h >> self._shift
+        lo, hi = self._offsets[b], self._offsets[b + 1]
+        i = bisect_left(self._keys, h, lo, hi)
+        return i < hi and self._keys[i] == h
+
+    def __contains__(self, key: str) -> bool:
+        h = hash(key) & _MASK64  # key_hash(), inlined on the hot path
+        if self.bloom is not None and not self.bloom.might_contain(h):
+            return False
+        b = h >> self._shift
+        lo, hi = self._offsets[b], self._offsets[b + 1]
+        i = bisect_left(self._keys, h, lo, hi)
+        return i < hi and self._keys[i] == h
+
+    @property
+    def nbytes(self) -> int:
+        size = self._keys.itemsize * len(self._keys) + self._offsets.itemsize * len(self._offsets)
+        return size + (self.bloom.nbytes if self.bloom is not None else 0)
@@ -0,0 +1,66 @@
+"""The one public-suffix extractor every module uses.
+
+Built from the snapshot bundled at PSL_PATH, with tldextract's network fetch
+and disk cache disabled, so extraction never blocks on egress or a writable
+cache directory. Refresh the snapshot with `python -m app.cli update-psl`.
+"""
+from __future__ import annotations
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+import tldextract
+
+from app.core.config import settings
+from app.core.logging import logger
+
+ICANN_MARKER = "===BEGIN ICANN DOMAINS==="
+
+_extractor: Optional[tldextract.TLDExtract] = None
+_lock = threading.Lock()
+
+def _build(path: Path) -> tldextract.TLDExtract:
+    if not path.exists():
+        logger.warning(f"Public suffix list not found at {path}; using tldextract's built-in snapshot.")
+    extractor = tldextract.TLDExtract(
+        cache_dir=None,
+        suffix_list_urls=(path.resolve().as_uri(),) if path.exists() else (),
+        fallback_to_snapshot=True,
+    )
+    # Parse the list now rather than on the first request.
+    extractor("example.com")
+    return extractor
+
+def get_extractor() -> tldextract.TLDExtract:
+    global _extractor
+    if _extractor is None:
+        with _lock:
+            if _extractor is None:
+                _extractor = _build(Path(settings.psl_path))
+    return _extractor
+
+def extract(host: str):
+    return get_extractor()(host)
+
+def update_snapshot(source: str, path: Optional[str] = None) -> int:
+    """Replace the bundled snapshot with `source` (a file path, or an http(s)
+    URL when egress is available). Validates the list and writes it
+    atomically; returns the number of rules."""
+    if source.startswith(("http://", "https://")):
+        import httpx
+        text = httpx.get(source, timeout=30, follow_redirects=True).raise_for_status().text
+    else:
+        text = Path(source).read_text(encoding="utf-8")
+    if ICANN_MARKER not in text:
+        raise ValueError(f"{source} does not look like a public suffix list")
+    rules = sum(1 for line in text.splitlines() if line.strip() and not line.startswith("//"))
+
+    target = Path(path or settings.psl_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".psl-")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, target)
+    return rules
@@ -1,21 +1,226 @@
+import os
+import threading
 from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.utils.hashindex import HashIndex
+from app.utils.url_canon import canonical_key, lookup_expressions
+
+MAX_HOST_LABELS = 10
+
+def domain_entry(line: str) -> str:
+    line = line.split("#", 1)[0].strip()
+    if not line:
+        return ""
+    d = line.split()[-1].lower().strip(".")
+    return d[2:] if d.startswith("*.") else d
+
+def url_entry(line: str) -> str:
+    """Canonical `host/path[?query]` key of a blocklisted URL."""
+    line = line.strip()
+    return "" if not line or line.startswith("#") else canonical_key(line)
+
+def domain_entries(lines: Iterable[str]) -> Iterator[str]:
+    """Domains from a blocklist: plain lists, hosts-file lines
+    ("0.0.0.0 evil.com") and "*.evil.com" wildcards; `#` starts a comment."""
+    return filter(None, map(domain_entry, lines))
+
+def url_entries(lines: Iterable[str]) -> Iterator[str]:
+    return filter(None, map(url_entry, lines))
+
+def host_suffixes(host: str) -> List[str]:
+    """`a.b.evil.com` -> [`a.b.evil.com`, `b.evil.com`, `evil.com`]: the host
+    and each parent domain, without the bare TLD."""
+    host = host.lower().strip(".")
+    if not host:
+        return []
+    start = 0
+    extra = host.count(".") - MAX_HOST_LABELS
+    while extra > 0:
+        start = host.index(".", start) + 1
+        extra -= 1
+    out = [host[start:]] if start else [host]
+    i = host.find(".", start)
+    while i != -1:
+        j = host.find(".", i + 1)
+        if j == -1:
+            break
+        out.append(host[i + 1:])
+        i = j
+    return out
+
+def _read_lines(path: Path) -> Iterator[str]:
+    if not path.exists():
+        return
+    with path.open(encoding="utf-8", errors="replace") as f:
+        yield from f
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def read_delta(path: Path, parse: Callable[[str], str]) -> Tuple[Set[str], Set[str]]:
+    """`+entry` adds, `-entry` removes, a bare entry adds; later lines win."""
+    added: Set[str] = set()
+    removed: Set[str] = set()
+    for line in _read_lines(path):
+        line = line.strip()
+        op = line[:1]
+        entry = parse(line[1:] if op in ("+", "-") else line)
+        if not entry:
+            continue
+        if op == "-":
+            removed.add(entry)
+            added.discard(entry)
+        else:
+            added.add(entry)
+            removed.discard(entry)
+    return added, removed
+
+class Blocklist:
+    """A large immutable base index plus a small delta overlay."""
+
+    def __init__(self, base: HashIndex, added: Set[str] = frozenset(), removed: Set[str] = frozenset()):
+        self.base = base
+        self.added = frozenset(added)
+        self.removed = frozenset(removed)
+
+    def with_delta(self, added: Set[str], removed: Set[str]) -> "Blocklist":
+        return Blocklist(self.base, added, removed)
+
+    def __contains__(self, key: str) -> bool:
+        if key in self.removed:
+            return False
+        return key in self.base or key in self.added
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.added)
+
+class _Snapshot:
+    def __init__(self, domains: Blocklist, urls: Blocklist, signatures: Dict[str, Optional[Tuple[int, int]]]):
+        self.domains = domains
+        self.urls = urls
+        self.signatures = signatures
 
 class ReputationStore:
-    def __init__(self):
-        base = Path(__file__).resolve().parents[2]  # backend/app
-        data_dir = base.parent / "data" / "reputation"
-        self.bad_domains = set()
-        self.bad_urls = set()
-        domains_file = data_dir / "blocklist_domains.txt"
-        urls_file = data_dir / "blocklist_urls.txt"
-
-        if domains_file.exists():
-            self.bad_domains = set([l.strip().lower() for l in domains_file.read_text().splitlines() if l.strip() and not l.startswith("#")])
-        if urls_file.exists():
-            self.bad_urls = set([l.strip() for l in urls_file.read_text().splitlines() if l.strip() and not l.startswith("#")])
+    """Local blocklists, held in compact hash indexes.
+
+    A listed domain also blocks every subdomain: `login.evil.com` hits when
+    `evil.com` is listed. URLs are canonicalized, so a listed
+    `http://evil.com/login` also matches `https://www.EVIL.com/login/?x=1`
+    and anything under `/login/`.
+
+    `reload()` rebuilds the lists off the request path and swaps them in
+    with a single reference assignment, so lookups never see a half-built
+    list. Small updates go in `*.delta.txt` files (`+entry` / `-entry`),
+    which are re-read without re-parsing the base feed. `start_reloader()`
+    polls the files' mtime and size in a background thread.
+    """
+
+    FILES = {
+        "domains": "blocklist_domains.txt",
+        "urls": "blocklist_urls.txt",
+        "domains_delta": "blocklist_domains.delta.txt",
+        "urls_delta": "blocklist_urls.delta.txt",
+    }
+
+    def __init__(self, data_dir: Optional[str] = None, bloom_bits_per_item: Optional[float] = None):
+        self.data_dir = Path(data_dir or settings.reputation_data_dir)
+        self.bloom = settings.reputation_bloom_bits_per_item if bloom_bits_per_item is None else bloom_bits_per_item
+        self.reloads = 0
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._snapshot = self._build(None, self._signatures())
+
+    def _path(self, name: str) -> Path:
+        return self.data_dir / self.FILES[name]
+
+    def _signatures(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        return {name: _signature(self._path(name)) for name in self.FILES}
+
+    def _build(self, current: Optional[_Snapshot], signatures) -> _Snapshot:
+        def unchanged(name):
+            return current is not None and current.signatures.get(name) == signatures[name]
+
+        lists = {}
+        for name, parse, entries in (("domains", domain_entry, domain_entries), ("urls", url_entry, url_entries)):
+            if unchanged(name):
+                base = getattr(current, name).base
+            else:
+                base = HashIndex(entries(_read_lines(self._path(name))), bloom_bits_per_item=self.bloom)
+            if unchanged(name) and unchanged(name + "_delta"):
+                lists[name] = getattr(current, name)
+            else:
+                lists[name] = Blocklist(base, *read_delta(self._path(name + "_delta"), parse))
+        return _Snapshot(lists["domains"], lists["urls"], signatures)
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild whatever changed on disk (everything with `force`).
+        Returns True when a new snapshot was swapped in."""
+        with self._reload_lock:
+            current = self._snapshot
+            signatures = self._signatures()
+            if not force and signatures == current.signatures:
+                return False
+            self._snapshot = self._build(None if force else current, signatures)
+            self.reloads += 1
+        logger.info(f"Reputation blocklists reloaded: {self.stats()}")
+        return True
+
+    def start_reloader(self, interval_seconds: Optional[float] = None) -> None:
+        interval = settings.reputation_reload_interval_seconds if interval_seconds is None else interval_seconds
+        if interval <= 0:
+            return
+        alive = self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid()
+        if alive:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, args=(interval,), name="reputation-reloader", daemon=True)
+        self._thread_pid = os.getpid()
+        self._thread.start()
+
+    def stop_reloader(self) -> None:
+        self._stop.set()
+
+    def _poll(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.reload()
+            except Exception as ex:
+                # Keep serving the previous snapshot.
+                logger.warning(f"Reputation blocklist reload failed: {ex}")
 
     def is_bad_domain(self, domain: str) -> bool:
-        return bool(domain) and domain.lower() in self.bad_domains
+        """True when the host or any of its parent domains is listed."""
+        domains = self._snapshot.domains
+        return bool(domain) and any(d in domains for d in host_suffixes(domain))
 
     def is_bad_url(self, url: str) -> bool:
-        return bool(url) and url.strip() in self.bad_urls
+        """True when any host-suffix/path-prefix expression of the canonical
+        URL is listed (see app.utils.url_canon)."""
+        if not url:
+            return False
+        urls = self._snapshot.urls
+        return any(e in urls for e in lookup_expressions(url))
+
+    def stats(self) -> dict:
+        snap = self._snapshot
+        return {
+            "domains": len(snap.domains),
+            "urls": len(snap.urls),
+            "delta": {
+                "domains_added": len(snap.domains.added),
+                "domains_removed": len(snap.domains.removed),
+                "urls_added": len(snap.urls.added),
+                "urls_removed": len(snap.urls.removed),
+            },
+            "bytes": snap.domains.base.nbytes + snap.urls.base.nbytes,
+            "reloads": self.reloads,
+        }
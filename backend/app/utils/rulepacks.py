@@ -1,5 +1,10 @@
 import re
-from typing import List, Dict
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants, sre_parse
 
 GENERAL_RULEPACK = [
     {"pattern": r"\bverify( now)?\b", "weight": 0.15, "reason": "Verification pressure detected (verify now)."},
@@ -20,16 +25,147 @@ KENYA_MPESA_RULEPACK = [
     {"pattern": r"\b(verify|thibitisha)\b.*\baccount\b|\bupdate\b.*\baccount\b", "weight": 0.12, "reason": "Account verification/update request detected."},
 ]
 
+
+_WORD_RE = re.compile(r"\w+")
+_BOUNDARY_ATS = {sre_constants.AT_BOUNDARY, sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING}
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, sre_constants.POSSESSIVE_REPEAT}
+# Characters re.IGNORECASE equates with an ASCII letter but casefold() does not.
+_FOLD = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"})
+
+def _fold(s: str) -> str:
+    return s.translate(_FOLD).casefold()
+
+def _is_word(ch: str) -> bool:
+    return bool(_WORD_RE.match(ch))
+
+def _best(candidates: List[FrozenSet[str]]) -> Optional[FrozenSet[str]]:
+    return max(candidates, key=lambda c: min(len(a) for a in c), default=None)
+
+def _walk(items, run: Optional[str]) -> Tuple[List[FrozenSet[str]], Optional[str]]:
+    """Collect anchor sets for a parsed pattern.
+
+    `run` is the word literal read since the last guaranteed token start, or
+    None when no token start is known. Each returned anchor set promises that
+    any match makes at least one of its words the prefix of a word token.
+    """
+    cands: List[FrozenSet[str]] = []
+
+    def close():
+        if run:
+            cands.append(frozenset([run]))
+
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            ch = chr(av)
+            if _is_word(ch):
+                run = run + ch if run is not None else None
+            else:
+                close()
+                run = ""
+        elif op is sre_constants.AT and av in _BOUNDARY_ATS:
+            close()
+            run = ""
+        elif op is sre_constants.SUBPATTERN:
+            sub, run = _walk(av[-1], run)
+            cands.extend(sub)
+        elif op is sre_constants.BRANCH:
+            close()
+            per_alt = []
+            for alt in av[1]:
+                sub, end = _walk(alt, run)
+                best = _best(sub + ([frozenset([end])] if end else []))
+                if best is None:
+                    per_alt = None
+                    break
+                per_alt.append(best)
+            if per_alt:
+                cands.append(frozenset().union(*per_alt))
+            run = None
+        elif op in _REPEATS:
+            close()
+            lo, _, sub = av
+            if lo >= 1:
+                cands.extend(_walk(sub, run)[0])
+            run = None
+        else:
+            close()
+            run = None
+    return cands, run
+
+def _anchors(pattern: str) -> Optional[FrozenSet[str]]:
+    try:
+        cands, end = _walk(sre_parse.parse(pattern, re.IGNORECASE), None)
+    except Exception:
+        return None
+    if end:
+        cands.append(frozenset([end]))
+    best = _best(cands)
+    return frozenset(_fold(a) for a in best) if best else None
+
+class RuleScan(NamedTuple):
+    score: float
+    hits: List[Dict]
+
+class RuleMatcher:
+    """Rules compiled once, matched in a single pass over the text.
+
+    Every pattern is reduced to anchor words that must start a token in any
+    matching text. One tokenization pass looks those up in an index, and only
+    the rules whose anchors are present run their regex. Rules without a
+    provable anchor are always checked.
+    """
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = list(rules)
+        self._compiled = [re.compile(r["pattern"], flags=re.IGNORECASE) for r in self.rules]
+        self._index: Dict[str, List[int]] = {}
+        self._always: List[int] = []
+        for i, r in enumerate(self.rules):
+            anchors = _anchors(r["pattern"])
+            if not anchors:
+                self._always.append(i)
+                continue
+            for a in anchors:
+                self._index.setdefault(a, []).append(i)
+        self._anchor_lengths = sorted({len(a) for a in self._index})
+
+    def candidates(self, text: str) -> List[int]:
+        found = set(self._always)
+        for token in set(_WORD_RE.findall(text)):
+            token = _fold(token)
+            for n in self._anchor_lengths:
+                if n > len(token):
+                    break
+                ids = self._index.get(token[:n])
+                if ids:
+                    found.update(ids)
+        return sorted(found)
+
+    def scan(self, text: str) -> RuleScan:
+        hits = [self.rules[i] for i in self.candidates(text) if self._compiled[i].search(text)]
+        total = sum(float(r["weight"]) for r in hits)
+        return RuleScan(score=min(1.0, total / 0.9), hits=hits)
+
+_MATCHERS: Dict[Tuple[int, bool], Tuple[List[Dict], int, RuleMatcher]] = {}
+
+def compiled(rulepack: List[Dict], include_general: bool = False) -> RuleMatcher:
+    """The compiled matcher for a rulepack list, built on first use."""
+    key = (id(rulepack), include_general)
+    entry = _MATCHERS.get(key)
+    if entry is None or entry[0] is not rulepack or entry[1] != len(rulepack):
+        rules = rulepack + GENERAL_RULEPACK if include_general else rulepack
+        entry = (rulepack, len(rulepack), RuleMatcher(rules))
+        _MATCHERS[key] = entry
+    return entry[2]
+
+# Everything the text pipeline scores and explains with, in explanation order.
+DEFAULT_MATCHER = compiled(KENYA_MPESA_RULEPACK, include_general=True)
+
+def match_rules(text: str) -> RuleScan:
+    return DEFAULT_MATCHER.scan(text)
+
 def score_text_rules(text: str, rulepack: List[Dict]) -> float:
-    total = 0.0
-    for r in rulepack + GENERAL_RULEPACK:
-        if re.search(r["pattern"], text, flags=re.IGNORECASE):
-            total += float(r["weight"])
-    return min(1.0, total / 0.9)
+    return compiled(rulepack, include_general=True).scan(text).score
 
 def find_rule_hits(text: str, rulepack: List[Dict]) -> List[Dict]:
-    hits = []
-    for r in rulepack:
-        if re.search(r["pattern"], text, flags=re.IGNORECASE):
-            hits.append(r)
-    return hits
+    return compiled(rulepack).scan(text).hits
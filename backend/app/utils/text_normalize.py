@@ -15,3 +15,12 @@ def normalize_text(text: str) -> str:
     t = OTP_RE.sub("<otp>", t)
     t = re.sub(r"\s+", " ", t)
     return t
+
+def extract_urls(text: str):
+    urls = []
+    for m in URL_RE.finditer(text or ""):
+        u = m.group(0).strip().rstrip(").,;!")
+        if u.lower().startswith("www."):
+            u = "http://" + u
+        urls.append(u)
+    return list(dict.fromkeys(urls))
@@ -0,0 +1,125 @@
+"""URL canonicalization and lookup expressions, after Safe Browsing.
+
+A URL is reduced to `host/path[?query]` with the trivial variations removed
+(case, `www.`, default scheme, port, userinfo, fragment, repeated and
+inconsistent percent-encoding, dot segments, duplicate and trailing slashes,
+query-parameter order). A blocklist entry for `evil.com/login` then matches
+any URL whose canonical host is `evil.com` or a subdomain of it and whose path
+is `/login` or lies below it.
+"""
+import re
+import socket
+from typing import List, Optional, Tuple
+from urllib.parse import unquote
+
+MAX_HOST_SUFFIXES = 5
+MAX_PATH_PREFIXES = 4
+
+_CONTROL = re.compile(r"[\t\r\n]")
+_SCHEME = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://")
+_IPV4ISH = re.compile(r"^[0-9a-fx.]+$")
+_NEEDS_ESCAPE = re.compile(r"[^\x21-\x7e]|[#%]")
+
+def _unescape(s: str) -> str:
+    if "%" not in s:
+        return s
+    for _ in range(5):
+        unescaped = unquote(s, errors="surrogateescape")
+        if unescaped == s:
+            break
+        s = unescaped
+    return s
+
+def _escape(s: str) -> str:
+    if not _NEEDS_ESCAPE.search(s):
+        return s
+    out = []
+    for b in s.encode("utf-8", errors="surrogateescape"):
+        if b <= 0x20 or b >= 0x7F or b in (0x23, 0x25):  # space/control, non-ASCII, '#', '%'
+            out.append(f"%{b:02X}")
+        else:
+            out.append(chr(b))
+    return "".join(out)
+
+def _canonical_host(host: str) -> str:
+    host = _unescape(host).lower().strip(".")
+    if ".." in host:
+        host = re.sub(r"\.{2,}", ".", host)
+    if _IPV4ISH.match(host):
+        try:
+            host = socket.inet_ntoa(socket.inet_aton(host))
+        except OSError:
+            pass
+    if host.startswith("www."):
+        host = host[4:]
+    return _escape(host)
+
+def _canonical_path(path: str) -> str:
+    segments: List[str] = []
+    for seg in _unescape(path).split("/"):
+        if seg in ("", "."):
+            continue
+        if seg == "..":
+            if segments:
+                segments.pop()
+            continue
+        segments.append(seg)
+    return _escape("/" + "/".join(segments))
+
+def _canonical_query(query: str) -> str:
+    params = sorted(p for p in _unescape(query).split("&") if p)
+    return _escape("&".join(params))
+
+def split_canonical(url: str) -> Optional[Tuple[str, str, str]]:
+    """(host, path, query) of the canonical form, or None without a host."""
+    url = _CONTROL.sub("", url.strip())
+    if not _SCHEME.match(url):
+        url = "http://" + url
+    rest = url.split("://", 1)[1].split("#", 1)[0]
+
+    cut = min((i for i in (rest.find("/"), rest.find("?")) if i != -1), default=len(rest))
+    authority, rest = rest[:cut], rest[cut:]
+    host = authority.rsplit("@", 1)[-1]
+    host = host[:host.find("]") + 1] if host.startswith("[") else host.split(":", 1)[0]
+    host = _canonical_host(host)
+    if not host:
+        return None
+
+    path, _, query = rest.partition("?")
+    return host, _canonical_path(path), _canonical_query(query)
+
+def canonical_key(url: str) -> str:
+    """`host/path[?query]` for a blocklist entry; "" when unparseable."""
+    parts = split_canonical(url)
+    if parts is None:
+        return ""
+    host, path, query = parts
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+def lookup_expressions(url: str) -> List[str]:
+    """Every blocklist key that should match `url`: up to MAX_HOST_SUFFIXES
+    host suffixes times the exact path (with and without query) and up to
+    MAX_PATH_PREFIXES path prefixes from the root."""
+    parts = split_canonical(url)
+    if parts is None:
+        return []
+    host, path, query = parts
+
+    labels = host.split(".")
+    hosts = [host]
+    if not host.replace(".", "").isdigit():
+        tail = labels[-MAX_HOST_SUFFIXES:]
+        hosts += [".".join(tail[i:]) for i in range(len(tail) - 1) if ".".join(tail[i:]) != host]
+
+    paths = []
+    if query:
+        paths.append(f"{path}?{query}")
+    paths.append(path)
+    segments = path.strip("/").split("/") if path != "/" else []
+    prefix = ""
+    for seg in segments[:MAX_PATH_PREFIXES - 1]:
+        prefix += "/" + seg
+        paths.append(prefix)
+    paths.append("/")
+
+    return [h + p for h in hosts for p in dict.fromkeys(paths)]
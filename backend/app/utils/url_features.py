@@ -1,83 +1,223 @@
 from __future__ import annotations
 import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
 from urllib.parse import urlparse
-import tldextract
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils import psl
 
 SHORTENERS = {
     "bit.ly", "t.co", "tinyurl.com", "goo.gl", "cutt.ly", "rb.gy", "is.gd", "ow.ly", "shorturl.at"
 }
 SUSPICIOUS_TLDS = {"zip", "mov", "top", "xyz", "click", "link", "info", "icu"}
 IP_RE = re.compile(r"^(\d{1,3}\.){3}\d{1,3}$")
+BRANDS = {"google", "microsoft", "paypal", "apple", "safaricom", "mpesa", "facebook"}
+BRAND_DOMAINS = {f"{b}.com" for b in BRANDS}
+
+@dataclass(frozen=True)
+class ParsedURL:
+    """A URL split once into the parts intel and the URL model look at."""
+    url: str           # as given
+    normalized: str    # with http:// added when there is no http(s) scheme
+    scheme: str
+    host: str
+    domain: str        # registrable domain, e.g. "example.co.ke"
+    suffix: str        # public suffix, e.g. "co.ke"
+    path: str
+    query: str
+
+def _with_scheme(url: str) -> str:
+    return url if url[:8].lower().startswith(("http://", "https://")) else "http://" + url
+
+def _urlparse(u: str) -> Tuple[str, str, str, str]:
+    """(scheme, hostname, path, query) as urlparse reports them; all empty
+    for a URL urlparse rejects (unbalanced IPv6 brackets, say), so one
+    malformed link in a message can't fail the analysis."""
+    try:
+        p = urlparse(u)
+    except ValueError:
+        return "", "", "", ""
+    return (p.scheme or "").lower(), p.hostname or "", p.path or "", p.query or ""
+
+def check_url(url: str) -> str:
+    """`url` unchanged if it can be parsed, else ValueError. For validating
+    URLs submitted for analysis."""
+    try:
+        urlparse(_with_scheme(url))
+    except ValueError as ex:
+        raise ValueError(f"invalid URL: {ex}") from None
+    return url
 
-def is_shortener_domain(domain: str) -> bool:
-    return (domain or "").lower() in SHORTENERS
+def _parse_url(url: str) -> ParsedURL:
+    u = _with_scheme(url)
+    scheme, host, path, query = _urlparse(u)
+    ext = psl.extract(host)
+    return ParsedURL(
+        url=url,
+        normalized=u,
+        scheme=scheme,
+        host=host,
+        domain=".".join([x for x in [ext.domain, ext.suffix] if x]),
+        suffix=ext.suffix or "",
+        path=path,
+        query=query,
+    )
 
-def looks_like_ip_host(host: str) -> bool:
+# Shared by every stage of a request (and by repeated URLs across requests).
+parse_url = lru_cache(maxsize=settings.url_parse_cache_size)(_parse_url)
+
+def is_shortener_domain(p: ParsedURL) -> bool:
+    return p.domain.lower() in SHORTENERS
+
+def looks_like_ip_host(p: ParsedURL) -> bool:
+    host = p.host
     if not host:
         return False
     if IP_RE.match(host):
         parts = host.split(".")
         try:
-            return all(0 <= int(p) <= 255 for p in parts)
+            return all(0 <= int(x) <= 255 for x in parts)
         except ValueError:
             return False
     return False
 
-def suspicious_tld(domain: str) -> bool:
-    ext = tldextract.extract(domain or "")
-    return (ext.suffix or "").lower() in SUSPICIOUS_TLDS
+def suspicious_tld(p: ParsedURL) -> bool:
+    return p.suffix.lower() in SUSPICIOUS_TLDS
 
-def count_dots(host: str) -> int:
-    return (host or "").count(".")
+def count_dots(p: ParsedURL) -> int:
+    return p.host.count(".")
 
-def url_length(url: str) -> int:
-    return len(url or "")
+def url_length(p: ParsedURL) -> int:
+    return len(p.url)
 
-def has_at_symbol(url: str) -> bool:
-    return "@" in (url or "")
+def has_at_symbol(p: ParsedURL) -> bool:
+    return "@" in p.url
 
-def has_punycode(host: str) -> bool:
-    h = host or ""
-    return h.startswith("xn--") or "xn--" in h
+def has_punycode(p: ParsedURL) -> bool:
+    return "xn--" in p.host
 
-def has_misleading_subdomain(host: str) -> bool:
-    if not host:
+def has_misleading_subdomain(p: ParsedURL) -> bool:
+    if not p.host:
         return False
-    parts = host.split(".")
+    parts = p.host.split(".")
     if len(parts) < 3:
         return False
-    brands = {"google", "microsoft", "paypal", "apple", "safaricom", "mpesa", "facebook"}
-    ext = tldextract.extract(host)
-    registrable = ".".join([p for p in [ext.domain, ext.suffix] if p]).lower()
     sub = ".".join(parts[:-2]).lower()
-    return any(b in sub for b in brands) and registrable not in {f"{b}.com" for b in brands}
-
-def url_to_features(url: str):
-    u = url if url.startswith(("http://", "https://")) else "http://" + url
-    p = urlparse(u)
-    host = p.hostname or ""
-    ext = tldextract.extract(host)
-    domain = ".".join([x for x in [ext.domain, ext.suffix] if x])
-    path = p.path or ""
-    query = p.query or ""
+    return any(b in sub for b in BRANDS) and p.domain.lower() not in BRAND_DOMAINS
 
+def url_to_features(p: ParsedURL):
+    u = p.normalized
     feats = [
         len(u),
-        len(host),
-        len(domain),
-        len(path),
-        len(query),
-        host.count("."),
-        int(is_shortener_domain(domain)),
-        int(looks_like_ip_host(host)),
-        int("https" == (p.scheme or "").lower()),
+        len(p.host),
+        len(p.domain),
+        len(p.path),
+        len(p.query),
+        p.host.count("."),
+        int(is_shortener_domain(p)),
+        int(looks_like_ip_host(p)),
+        int("https" == p.scheme),
         int("@" in u),
         int(".." in u),
         int("=" in u),
         int("%" in u),
-        int(has_punycode(host)),
-        int(has_misleading_subdomain(host)),
+        int(has_punycode(p)),
+        int(has_misleading_subdomain(p)),
         sum(ch.isdigit() for ch in u),
         sum(ch in "-_." for ch in u),
     ]
     return feats
+
+FEATURE_NAMES = [
+    "url_len", "host_len", "domain_len", "path_len", "query_len", "host_dots",
+    "shortener", "ip_host", "https", "has_at", "has_dotdot", "has_eq", "has_pct",
+    "punycode", "misleading_subdomain", "digits", "separators",
+]
+
+# Longer URLs (and ones the fixed-width array can't hold exactly) go through
+# url_to_features instead, to keep each chunk's character matrix small.
+MAX_VECTOR_LEN = 512
+CHUNK_SIZE = 8192
+
+_CP = {c: ord(c) for c in "@=%.-_09"}
+
+# ASCII URLs urlparse splits trivially: no fragment, params, brackets,
+# backslashes, whitespace/control characters or %-escapes in the netloc.
+_PLAIN_URL = re.compile(
+    r"(?i:(https?))://([^/?#\[\]\\%\x00-\x20\x7f]*)(/[^?#;\[\]\\\x00-\x20\x7f]*)?(?:\?([^#\[\]\\\x00-\x20\x7f]*))?"
+)
+
+def _split(u: str) -> Tuple[str, str, str, str]:
+    """(scheme, hostname, path, query) exactly as urlparse reports them."""
+    m = _PLAIN_URL.fullmatch(u)
+    if m is None:
+        return _urlparse(u)
+    scheme, netloc, path, query = m.groups()
+    host = netloc.rpartition("@")[2].partition(":")[0].lower()
+    return scheme.lower(), host, path or "", query or ""
+
+def _host_features(host: str) -> Tuple[int, ...]:
+    ext = psl.extract(host)
+    domain = ".".join([x for x in [ext.domain, ext.suffix] if x])
+    p = ParsedURL(url="", normalized="", scheme="", host=host, domain=domain,
+                  suffix=ext.suffix or "", path="", query="")
+    return (
+        len(host), len(domain), host.count("."), int(is_shortener_domain(p)),
+        int(looks_like_ip_host(p)), int(has_punycode(p)), int(has_misleading_subdomain(p)),
+    )
+
+def _char_features(normalized: Sequence[str]) -> np.ndarray:
+    """url_len, has_at, has_dotdot, has_eq, has_pct, digits, separators for
+    URLs of at most MAX_VECTOR_LEN chars, from a (n, width) code point matrix."""
+    width = max(1, max(map(len, normalized)))
+    cps = np.array(normalized, dtype=f"<U{width}").view(np.uint32).reshape(len(normalized), width)
+    dot = cps == _CP["."]
+    out = np.empty((len(normalized), 7), dtype=np.int64)
+    out[:, 0] = np.count_nonzero(cps, axis=1)
+    out[:, 1] = (cps == _CP["@"]).any(axis=1)
+    out[:, 2] = (dot[:, :-1] & dot[:, 1:]).any(axis=1)
+    out[:, 3] = (cps == _CP["="]).any(axis=1)
+    out[:, 4] = (cps == _CP["%"]).any(axis=1)
+    out[:, 5] = ((cps >= _CP["0"]) & (cps <= _CP["9"])).sum(axis=1)
+    out[:, 6] = (dot | (cps == _CP["-"]) | (cps == _CP["_"])).sum(axis=1)
+    return out
+
+def url_feature_matrix(urls: Sequence[str]) -> np.ndarray:
+    """url_to_features for many URLs at once, as an (n, 17) int64 matrix.
+
+    Equal, row for row, to `[url_to_features(parse_url(u)) for u in urls]`.
+    Character counts are computed with NumPy over whole chunks; hostname
+    features (public-suffix lookup, brand and IP checks) once per distinct
+    host. Bypasses the parse_url memo so bulk runs don't evict live entries.
+    """
+    n = len(urls)
+    X = np.zeros((n, len(FEATURE_NAMES)), dtype=np.int64)
+    hosts: Dict[str, Tuple[int, ...]] = {}
+
+    for start in range(0, n, CHUNK_SIZE):
+        chunk = urls[start:start + CHUNK_SIZE]
+        vec_rows, vec_urls = [], []
+        for i, url in enumerate(chunk, start):
+            u = _with_scheme(url)
+            # Outliers: very long, NUL (numpy strips trailing NULs) or
+            # non-ASCII (str.isdigit also counts other scripts' digits).
+            if len(u) > MAX_VECTOR_LEN or not u.isascii() or "\x00" in u:
+                X[i] = url_to_features(_parse_url(url))
+                continue
+            scheme, host, path, query = _split(u)
+            hf = hosts.get(host)
+            if hf is None:
+                hf = hosts[host] = _host_features(host)
+            X[i, 1], X[i, 2], X[i, 5], X[i, 6], X[i, 7], X[i, 13], X[i, 14] = hf
+            X[i, 3] = len(path)
+            X[i, 4] = len(query)
+            X[i, 8] = scheme == "https"
+            vec_rows.append(i)
+            vec_urls.append(u)
+        if vec_rows:
+            X[np.ix_(vec_rows, [0, 9, 10, 11, 12, 15, 16])] = _char_features(vec_urls)
+    return X
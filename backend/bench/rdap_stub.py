@@ -0,0 +1,123 @@
+"""Local stand-in for rdap.org.
+
+    python -m bench.rdap_stub --port 8090 --latency-ms 150
+    RDAP_BASE_URL=http://127.0.0.1:8090 uvicorn app.main:app
+
+GET /domain/<name> answers like rdap.org: a 302 to /registry/domain/<name>,
+which returns an RDAP record whose registration date is derived from the
+name (names starting with "new" are 3 days old, "missing" names are 404).
+GET /stats reports request counts and peak concurrency.
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def record_for(domain: str):
+    if domain.startswith("missing"):
+        return None
+    if domain.startswith("new"):
+        days = 3
+    else:
+        days = 365 + int(hashlib.sha256(domain.encode()).hexdigest()[:6], 16) % 5000
+    created = datetime.now(timezone.utc) - timedelta(days=days)
+    return {
+        "objectClassName": "domain",
+        "ldhName": domain,
+        "events": [{"eventAction": "registration", "eventDate": created.strftime("%Y-%m-%dT%H:%M:%SZ")}],
+    }
+
+class RDAPStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, latency_s: float = 0.0, redirect: bool = True):
+        super().__init__(addr, _Handler)
+        self.latency_s = latency_s
+        self.redirect = redirect
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.lookups = {}
+        self.active = 0
+        self.peak_active = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "RDAPStub":
+        threading.Thread(target=self.serve_forever, name="rdap-stub", daemon=True).start()
+        return self
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "lookups": dict(self.lookups),
+                "peak_active": self.peak_active,
+            }
+
+class _Handler(BaseHTTPRequestHandler):
+    server: RDAPStub
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Type", "application/rdap+json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        srv = self.server
+        if self.path == "/stats":
+            return self._send(200, srv.stats())
+
+        with srv.lock:
+            srv.requests += 1
+            srv.active += 1
+            srv.peak_active = max(srv.peak_active, srv.active)
+        try:
+            if srv.latency_s:
+                time.sleep(srv.latency_s)
+            if self.path.startswith("/domain/"):
+                domain = self.path[len("/domain/"):].lower()
+                if srv.redirect:
+                    return self._send(302, headers={"Location": f"/registry/domain/{domain}"})
+            elif self.path.startswith("/registry/domain/"):
+                domain = self.path[len("/registry/domain/"):].lower()
+            else:
+                return self._send(404, {"errorCode": 404})
+
+            with srv.lock:
+                srv.lookups[domain] = srv.lookups.get(domain, 0) + 1
+            record = record_for(domain)
+            if record is None:
+                return self._send(404, {"errorCode": 404, "title": "Not Found"})
+            return self._send(200, record)
+        finally:
+            with srv.lock:
+                srv.active -= 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--no-redirect", action="store_true")
+    args = parser.parse_args()
+
+    srv = RDAPStub((args.host, args.port), latency_s=args.latency_ms / 1000, redirect=not args.no_redirect)
+    print(f"RDAP stub listening on {srv.base_url}")
+    srv.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Blocklist memory and lookup cost: Python set vs. HashIndex.
+
+    python -m bench.reputation --sizes 100000,1000000
+
+Builds synthetic domain blocklists and reports build time, memory (tracemalloc)
+and ns per lookup for exact hits, subdomain hits (`a.b.<listed>`) and misses.
+The set baseline only does exact matches, so for subdomains it checks each
+parent suffix the same way ReputationStore does.
+"""
+import argparse
+import gc
+import random
+import string
+import time
+import tracemalloc
+
+from app.utils.hashindex import HashIndex
+from app.utils.reputation import host_suffixes
+
+TLDS = ["com", "net", "org", "top", "xyz", "co.ke", "info", "online"]
+
+def synthetic_domains(n: int, seed: int = 3):
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase + string.digits
+    return [
+        "".join(rng.choice(letters) for _ in range(rng.randint(6, 16))) + "." + rng.choice(TLDS)
+        for _ in range(n)
+    ]
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    obj = build()
+    build_s = time.perf_counter() - t0
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, build_s, size
+
+def _ns_per_op(fn, queries, min_seconds: float) -> float:
+    done, start = 0, time.perf_counter()
+    while True:
+        for q in queries:
+            fn(q)
+        done += len(queries)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / done * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--bloom-bits", type=float, default=10.0)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'entries':>9} {'index':<14} {'build s':>8} {'MiB':>8} {'exact ns':>9} {'subdom ns':>10} {'miss ns':>8}")
+    for n in [int(x) for x in args.sizes.split(",")]:
+        domains = synthetic_domains(n)
+        rng = random.Random(5)
+        exact = rng.sample(domains, min(args.queries, n))
+        subdomains = [f"login.secure.{d}" for d in exact]
+        misses = synthetic_domains(args.queries, seed=99)
+
+        candidates = [
+            # Copies, so the set pays for its strings as it would when loaded from a file.
+            ("set", lambda: {(d + ".")[:-1] for d in domains}),
+            ("hashindex", lambda: HashIndex(domains)),
+            (f"+bloom({args.bloom_bits:g})", lambda: HashIndex(domains, bloom_bits_per_item=args.bloom_bits)),
+        ]
+        for name, build in candidates:
+            index, build_s, size = _measure(build)
+            assert all(d in index for d in exact)
+
+            def lookup(host, index=index):
+                return any(d in index for d in host_suffixes(host))
+
+            row = [_ns_per_op(lookup, qs, args.seconds) for qs in (exact, subdomains, misses)]
+            print(f"{n:>9} {name:<14} {build_s:>8.2f} {size / 2**20:>8.1f} {row[0]:>9.0f} {row[1]:>10.0f} {row[2]:>8.0f}")
+            del index
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Rule matching throughput as rulepacks grow.
+
+    python -m bench.rulepacks --sizes 13,100,1000,5000
+
+Compares the old per-rule re.search loop against the compiled RuleMatcher on
+synthetic rulepacks shaped like the shipped ones.
+"""
+import argparse
+import random
+import re
+import string
+import time
+
+from app.utils.rulepacks import GENERAL_RULEPACK, KENYA_MPESA_RULEPACK, RuleMatcher
+from app.utils.text_normalize import normalize_text
+
+SAMPLE_TEXTS = [
+    "M-PESA: Your account will be locked. Verify now at http://example-login-secure.com/verify",
+    "Safaricom: Dear customer, your line will be disconnected unless you update KYC now. Click link.",
+    "You have received Ksh 2,500 from JOHN. Reverse the transaction by sharing your PIN to confirm.",
+    "Hi mum, running late, see you at dinner. Don't forget the milk.",
+    "Your Fuliza limit has been raised. Login with your password within 24 hours to claim.",
+]
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+
+def synthetic_rules(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    rules = list(KENYA_MPESA_RULEPACK + GENERAL_RULEPACK)
+    while len(rules) < n:
+        a, b, c = _word(rng), _word(rng), _word(rng)
+        pattern = rng.choice([
+            rf"\b{a}\b",
+            rf"\b{a}\b.*\b{b}\b",
+            rf"\b{a}\b|\b{b}\b|\b{c}\b",
+            rf"\b({a}|{b}) (now|today)\b",
+        ])
+        rules.append({"pattern": pattern, "weight": 0.1, "reason": f"Synthetic rule {len(rules)}."})
+    return rules[:n]
+
+def synthetic_texts(rules, n: int, seed: int = 11):
+    rng = random.Random(seed)
+    vocab = [w for r in rules for w in re.findall(r"[a-z]{4,}", r["pattern"])]
+    texts = []
+    for i in range(n):
+        filler = " ".join(rng.choice(vocab) for _ in range(rng.randint(5, 40)))
+        texts.append(normalize_text(f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} {filler}"))
+    return texts
+
+def naive_scan(text, rules):
+    hits = [r for r in rules if re.search(r["pattern"], text, flags=re.IGNORECASE)]
+    return min(1.0, sum(float(r["weight"]) for r in hits) / 0.9), hits
+
+def _rate(fn, texts, min_seconds: float) -> float:
+    done, start = 0, time.perf_counter()
+    while True:
+        for t in texts:
+            fn(t)
+        done += len(texts)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return done / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="13,100,1000,5000")
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'rules':>7} {'build ms':>9} {'naive msg/s':>12} {'matcher msg/s':>14} {'speedup':>8}")
+    for n in [int(x) for x in args.sizes.split(",")]:
+        rules = synthetic_rules(n)
+        texts = synthetic_texts(rules, args.texts)
+
+        t0 = time.perf_counter()
+        matcher = RuleMatcher(rules)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        for t in texts:
+            score, hits = naive_scan(t, rules)
+            scan = matcher.scan(t)
+            assert scan.hits == hits and scan.score == score, "matcher disagrees with naive scan"
+
+        naive = _rate(lambda t: naive_scan(t, rules), texts, args.seconds)
+        fast = _rate(matcher.scan, texts, args.seconds)
+        print(f"{n:>7} {build_ms:>9.1f} {naive:>12.0f} {fast:>14.0f} {fast / naive:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Per-stage timings of the analysis pipeline, comparable between commits.
+
+    python -m bench.stages                          # writes bench/results/stages-<commit>.json
+    python -m bench.stages --baseline bench/results/stages-abc1234.json
+    python -m bench.stages --compare OLD.json NEW.json
+
+Each stage runs over a synthetic corpus (bench.corpus) for several rounds
+after one warm-up round; the median and best per-item time are recorded.
+RDAP is served by an in-process bench.rdap_stub and Redis isn't used, so
+intel timings are steady-state (domain ages cached after the warm-up).
+Comparisons flag stages whose median got slower than --threshold and exit
+with status 1 if any did.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.core.config import settings
+from app.utils.rulepacks import KENYA_MPESA_RULEPACK, find_rule_hits, score_text_rules
+from app.utils.text_normalize import normalize_text
+from app.utils.url_features import _parse_url, url_feature_matrix, url_to_features
+from bench.corpus import email_corpus, sms_corpus, url_corpus
+from bench.rdap_stub import RDAPStub
+
+RESULTS_DIR = Path("bench/results")
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def _commit() -> str:
+    sha = _git("rev-parse", "--short", "HEAD") or "unknown"
+    return sha + ("-dirty" if _git("status", "--porcelain", "--untracked-files=no") else "")
+
+def measure(fn, items: int, rounds: int) -> dict:
+    """Run fn() (which processes `items` inputs) once to warm up, then
+    `rounds` times; per-item nanoseconds."""
+    fn()
+    samples = []
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - start) / items)
+    return {
+        "ns_per_item": round(statistics.median(samples), 1),
+        "best_ns_per_item": round(min(samples), 1),
+        "items": items,
+        "rounds": rounds,
+    }
+
+def build_stages(n_texts: int, n_urls: int, batch: int):
+    """(name, fn, items) for every stage. Imports the pipeline lazily so the
+    RDAP stub is configured first."""
+    from app.services.context import AnalysisContext, email_raw_text
+    from app.services.explain import Explainer
+    from app.services.intel import IntelLayer
+    from app.services.ml_inference import MLInference
+    from app.services.risk import RiskScorer
+
+    sms = sms_corpus(n_texts)
+    emails = [email_raw_text(e["subject"], e["sender"], None, e["body"]) for e in email_corpus(n_texts // 4)]
+    urls = url_corpus(n_urls)
+    cleans = [normalize_text(t) for t in sms]
+    parsed = [_parse_url(u) for u in urls]
+
+    ml = MLInference()
+    ml.warmup()
+    intel = IntelLayer(cache=None)
+    risk = RiskScorer()
+    explain = Explainer()
+
+    contexts = [AnalysisContext(t, t) for t in sms]
+    for ctx in contexts:
+        ctx.prime()
+    intel.prefetch_domains(link.domain for ctx in contexts for link in ctx.links if link.domain)
+    intel.prefetch_domains(p.domain for p in parsed)
+    text_intel = [intel.inspect_context(ctx) for ctx in contexts]
+    url_intel = [intel.inspect_url(u) for u in urls]
+    text_ml = ml.predict_normalized_text_batch(cleans)
+    url_ml = ml.predict_url_batch(urls)
+    rows = [(m["prob_phish"], i["heuristic_score"], i["intel_score"]) for m, i in zip(text_ml, text_intel)]
+    levels = [level for _, level in risk.score_batch(rows)]
+
+    def batched(fn, xs):
+        return lambda: [fn(xs[i:i + batch]) for i in range(0, len(xs), batch)]
+
+    n, e, u = len(sms), len(emails), len(urls)
+    return [
+        ("normalize_text.sms", lambda: [normalize_text(t) for t in sms], n),
+        ("normalize_text.email", lambda: [normalize_text(t) for t in emails], e),
+        ("score_text_rules", lambda: [score_text_rules(t, KENYA_MPESA_RULEPACK) for t in cleans], n),
+        ("find_rule_hits", lambda: [find_rule_hits(t, KENYA_MPESA_RULEPACK) for t in cleans], n),
+        ("parse_url", lambda: [_parse_url(x) for x in urls], u),
+        ("url_to_features", lambda: [url_to_features(p) for p in parsed], u),
+        ("url_feature_matrix", batched(url_feature_matrix, urls), u),
+        ("intel.inspect_text", lambda: [intel.inspect_text(t) for t in sms], n),
+        ("intel.inspect_context", lambda: [intel.inspect_context(c) for c in contexts], n),
+        ("intel.inspect_url", lambda: [intel.inspect_url(x) for x in urls], u),
+        ("ml.predict_text", lambda: [ml.predict_text(t) for t in sms[:2000]], min(n, 2000)),
+        (f"ml.predict_text_batch.{batch}", batched(ml.predict_text_batch, sms), n),
+        ("ml.predict_url", lambda: [ml.predict_url(x) for x in urls[:2000]], min(u, 2000)),
+        (f"ml.predict_url_batch.{batch}", batched(ml.predict_url_batch, urls), u),
+        ("risk.score", lambda: [risk.score(*r) for r in rows], n),
+        ("risk.score_batch", batched(risk.score_batch, rows), n),
+        ("explain.explain_context", lambda: [
+            explain.explain_context(c, m["prob_phish"], i, lv)
+            for c, m, i, lv in zip(contexts, text_ml, text_intel, levels)
+        ], n),
+        ("explain.explain_url", lambda: [
+            explain.explain_url(x, m["prob_phish"], i, "HIGH") for x, m, i in zip(urls, url_ml, url_intel)
+        ], u),
+    ]
+
+def compare(old: dict, new: dict, threshold: float) -> bool:
+    """Print a side-by-side table; True if any stage regressed."""
+    print(f"{'stage':<32} {'old ns':>11} {'new ns':>11} {'change':>8}")
+    regressed = False
+    for name, result in new["stages"].items():
+        before = old["stages"].get(name)
+        if before is None:
+            print(f"{name:<32} {'-':>11} {result['ns_per_item']:>11.0f}")
+            continue
+        change = result["ns_per_item"] / before["ns_per_item"] - 1
+        flag = ""
+        if change > threshold:
+            flag, regressed = "  SLOWER", True
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<32} {before['ns_per_item']:>11.0f} {result['ns_per_item']:>11.0f} {change:>+7.0%}{flag}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=20000, help="SMS corpus size (emails: a quarter of it).")
+    parser.add_argument("--urls", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--only", default=None, help="Comma-separated stage name prefixes.")
+    parser.add_argument("--out", default=None, help="Result file (default: bench/results/stages-<commit>.json).")
+    parser.add_argument("--baseline", default=None, help="Compare this run against an earlier result file.")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown reported as a regression.")
+    args = parser.parse_args()
+
+    if args.compare:
+        old, new = (json.loads(Path(p).read_text()) for p in args.compare)
+        sys.exit(1 if compare(old, new, args.threshold) else 0)
+
+    stub = RDAPStub(("127.0.0.1", 0)).start()
+    settings.rdap_base_url = stub.base_url
+
+    only = tuple(args.only.split(",")) if args.only else None
+    results = {}
+    for name, fn, items in build_stages(args.texts, args.urls, args.batch):
+        if only and not name.startswith(only):
+            continue
+        results[name] = measure(fn, items, args.rounds)
+        r = results[name]
+        print(f"{name:<32} {r['ns_per_item']:>11.0f} ns/item  (best {r['best_ns_per_item']:.0f}, {items} items)")
+
+    commit = _commit()
+    report = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": {"texts": args.texts, "urls": args.urls, "batch": args.batch, "rounds": args.rounds},
+        "stages": results,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"stages-{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Saved {out}")
+
+    if args.baseline:
+        print()
+        if compare(json.loads(Path(args.baseline).read_text()), report, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Calibrated text ensemble vs. its CompactTextModel export.
+
+    python -m bench.text_model                       # the shipped artifact
+    python -m bench.text_model --synthetic-docs 20000  # a model with a full-size vocabulary
+
+Reports load time and RSS growth (each model loaded in a fresh process),
+single-message latency, batch throughput and the largest probability
+difference between the two.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from app.services.compact_text_model import CompactTextModel
+from app.services.ml_inference import _fmt_bytes, _rss_bytes
+from app.utils.text_normalize import normalize_text
+
+SCAM = ["verify", "account", "suspended", "pin", "mpesa", "click", "link", "urgent", "won", "claim", "password"]
+
+def synthetic_texts(n: int, vocab: int = 40000, seed: int = 7):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocab)]
+    texts, labels = [], []
+    for _ in range(n):
+        label = rng.random() < 0.4
+        body = [words[min(int(rng.paretovariate(0.8)), vocab - 1)] for _ in range(rng.randint(5, 40))]
+        if label or rng.random() < 0.1:
+            body += rng.sample(SCAM, rng.randint(1, 4))
+        rng.shuffle(body)
+        texts.append(" ".join(body))
+        labels.append(int(label))
+    return texts, labels
+
+def train_synthetic(n: int, path: str):
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    texts, labels = synthetic_texts(n)
+    base = Pipeline([
+        ("tfidf", TfidfVectorizer(ngram_range=(1, 2), analyzer="word", max_features=120000)),
+        ("clf", LogisticRegression(max_iter=2000, class_weight="balanced")),
+    ])
+    joblib.dump(CalibratedClassifierCV(base, method="isotonic", cv=3).fit(texts, labels), path)
+
+def measure_load(path: str) -> dict:
+    """Load `path` in a fresh interpreter; sklearn is imported first so only
+    the model itself is counted."""
+    code = (
+        "import json, time, joblib, sklearn.pipeline, sklearn.calibration, sklearn.feature_extraction.text\n"
+        "import app.services.compact_text_model\n"
+        "from app.services.ml_inference import _rss_bytes\n"
+        f"before = _rss_bytes(); t = time.perf_counter(); joblib.load({path!r})\n"
+        "print(json.dumps({'seconds': time.perf_counter() - t, 'rss': _rss_bytes() - before}))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return json.loads(out.stdout)
+
+def latency(model, texts, repeat: int):
+    samples = []
+    for i in range(repeat):
+        t = time.perf_counter()
+        model.predict_proba([texts[i % len(texts)]])
+        samples.append(time.perf_counter() - t)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+def throughput(model, texts, batch: int) -> float:
+    t = time.perf_counter()
+    for i in range(0, len(texts), batch):
+        model.predict_proba(texts[i:i + batch])
+    return len(texts) / (time.perf_counter() - t)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="ml/artifacts/text_model.joblib")
+    parser.add_argument("--synthetic-docs", type=int, default=0, help="Train a model on this many synthetic messages instead.")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=256)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = args.model
+        if args.synthetic_docs:
+            src = os.path.join(tmp, "text_model.joblib")
+            train_synthetic(args.synthetic_docs, src)
+        calibrated = joblib.load(src)
+        compact = CompactTextModel.from_calibrated(calibrated)
+        out = os.path.join(tmp, "text_model_compact.joblib")
+        joblib.dump(compact, out)
+
+        texts = [normalize_text(t) for t in synthetic_texts(args.messages, seed=11)[0]]
+        vocab = sum(len(f.estimator.steps[0][1].vocabulary_) for f in calibrated.calibrated_classifiers_)
+        print(f"{src}: {len(calibrated.calibrated_classifiers_)} folds, {vocab} fold vocabulary entries -> "
+              f"{compact.weights.shape[0]} shared terms")
+        diff = np.abs(calibrated.predict_proba(texts) - compact.predict_proba(texts)).max()
+        print(f"max |p_calibrated - p_compact| over {len(texts)} messages: {diff:.1e}")
+
+        print(f"{'model':<12} {'disk':>10} {'load':>8} {'+RSS':>10} {'p50 1 msg':>10} {'p99 1 msg':>10} {'msgs/s':>10}")
+        for name, model, path in (("calibrated", calibrated, src), ("compact", compact, out)):
+            load = measure_load(path)
+            p50, p99 = latency(model, texts, repeat=2000)
+            rate = throughput(model, texts, args.batch)
+            print(f"{name:<12} {_fmt_bytes(os.path.getsize(path)):>10} {load['seconds'] * 1000:>6.0f}ms "
+                  f"{_fmt_bytes(load['rss']):>10} {p50 * 1e6:>8.0f}us {p99 * 1e6:>8.0f}us {rate:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""URL feature extraction: per-URL url_to_features vs. url_feature_matrix.
+
+    python -m bench.url_features --n 1000000
+
+Generates synthetic URLs (a few thousand distinct hosts, varied paths and
+queries), checks that both paths produce identical matrices and reports
+URLs/s for each.
+"""
+import argparse
+import random
+import string
+import time
+
+import numpy as np
+
+from app.utils.url_features import _parse_url, url_feature_matrix, url_to_features
+
+TLDS = ["com", "net", "org", "top", "xyz", "co.ke", "info", "zip"]
+BRANDS = ["paypal", "mpesa", "safaricom", "google", "apple", "bank"]
+
+def synthetic_urls(n: int, hosts: int = 5000, seed: int = 13):
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase + string.digits
+
+    def word(lo=3, hi=10):
+        return "".join(rng.choice(letters) for _ in range(rng.randint(lo, hi)))
+
+    host_pool = []
+    for _ in range(hosts):
+        labels = [word() for _ in range(rng.randint(0, 2))]
+        if rng.random() < 0.1:
+            labels.insert(0, rng.choice(BRANDS))
+        host = ".".join(labels + [word(4, 14), rng.choice(TLDS)])
+        if rng.random() < 0.03:
+            host = ".".join(str(rng.randint(0, 255)) for _ in range(4))
+        host_pool.append(host)
+    host_pool += ["bit.ly", "t.co", "tinyurl.com"]
+
+    urls = []
+    for _ in range(n):
+        scheme = rng.choice(["http://", "https://", "", "www."])
+        path = "/".join(word(1, 8) for _ in range(rng.randint(0, 4)))
+        url = f"{scheme}{rng.choice(host_pool)}/{path}"
+        if rng.random() < 0.3:
+            url += "?" + "&".join(f"{word(1, 5)}={word(1, 12)}" for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.05:
+            url = url.replace("/", "/../", 1) if rng.random() < 0.5 else url + "%20@x"
+        urls.append(url)
+    return urls
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--hosts", type=int, default=5000)
+    args = parser.parse_args()
+
+    urls = synthetic_urls(args.n, hosts=args.hosts)
+
+    t0 = time.perf_counter()
+    scalar = np.array([url_to_features(_parse_url(u)) for u in urls], dtype=np.int64)
+    scalar_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = url_feature_matrix(urls)
+    batch_s = time.perf_counter() - t0
+
+    assert np.array_equal(scalar, batch), "url_feature_matrix disagrees with url_to_features"
+    print(f"{'path':<20} {'seconds':>8} {'URLs/s':>10}")
+    print(f"{'url_to_features':<20} {scalar_s:>8.2f} {args.n / scalar_s:>10.0f}")
+    print(f"{'url_feature_matrix':<20} {batch_s:>8.2f} {args.n / batch_s:>10.0f}")
+    print(f"speedup {scalar_s / batch_s:.1f}x, identical: yes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Export the calibrated text model as a CompactTextModel.
+
+    python -m ml.export_text [--src ml/build/text_model.joblib] [--out ml/build/text_model_compact.joblib]
+
+Checks that the export reproduces the source model's probabilities on the
+training texts and the smoke set before writing it.
+"""
+import argparse
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.services.compact_text_model import CompactTextModel
+from app.utils.text_normalize import normalize_text
+
+TOLERANCE = 1e-9
+
+def export(src: str, out: str) -> float:
+    calibrated = joblib.load(src)
+    compact = CompactTextModel.from_calibrated(calibrated)
+
+    texts = pd.read_csv("data/text_train.csv")["text"].astype(str).tolist()
+    with open(settings.model_smoke_set_path, encoding="utf-8") as f:
+        texts += [c["input"] for c in json.load(f).get("text", [])]
+    cleans = [normalize_text(t) for t in texts] + [""]
+    diff = float(np.abs(calibrated.predict_proba(cleans) - compact.predict_proba(cleans)).max())
+    if diff > TOLERANCE:
+        raise ValueError(f"exported model differs from {src} by up to {diff:.2e}")
+
+    joblib.dump(compact, out)
+    return diff
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--src", default="ml/build/text_model.joblib")
+    parser.add_argument("--out", default="ml/build/text_model_compact.joblib")
+    args = parser.parse_args()
+
+    diff = export(args.src, args.out)
+    print(f"Saved: {args.out} (max probability difference {diff:.1e})")
+
+if __name__ == "__main__":
+    main()
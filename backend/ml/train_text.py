@@ -1,3 +1,5 @@
+import os
+
 import joblib
 import pandas as pd
 from sklearn.model_selection import train_test_split
@@ -8,6 +10,7 @@ from sklearn.calibration import CalibratedClassifierCV
 from sklearn.metrics import classification_report
 
 from app.utils.text_normalize import normalize_text
+from ml.export_text import export
 
 def main():
     df = pd.read_csv("data/text_train.csv")
@@ -28,8 +31,13 @@ def main():
     pred = cal.predict(X_test)
     print(classification_report(y_test, pred))
 
-    joblib.dump(cal, "ml/artifacts/text_model.joblib")
-    print("Saved: ml/artifacts/text_model.joblib")
+    # Unregistered output; ship the compact file with `python -m app.cli register-model text`.
+    os.makedirs("ml/build", exist_ok=True)
+    joblib.dump(cal, "ml/build/text_model.joblib")
+    print("Saved: ml/build/text_model.joblib")
+
+    export("ml/build/text_model.joblib", "ml/build/text_model_compact.joblib")
+    print("Saved: ml/build/text_model_compact.joblib")
 
 if __name__ == "__main__":
     main()
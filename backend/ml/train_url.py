@@ -1,14 +1,16 @@
+import os
+
 import joblib
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report
 
-from app.utils.url_features import url_to_features
+from app.utils.url_features import url_feature_matrix
 
 def main():
     df = pd.read_csv("data/url_train.csv")
-    X = df["url"].astype(str).map(url_to_features).tolist()
+    X = url_feature_matrix(df["url"].astype(str).tolist())
     y = df["label"].astype(int).tolist()
 
     X_train, X_test, y_train, y_test = train_test_split(
@@ -21,8 +23,10 @@ def main():
     pred = model.predict(X_test)
     print(classification_report(y_test, pred))
 
-    joblib.dump(model, "ml/artifacts/url_model.joblib")
-    print("Saved: ml/artifacts/url_model.joblib")
+    # Unregistered output; ship it with `python -m app.cli register-model url`.
+    os.makedirs("ml/build", exist_ok=True)
+    joblib.dump(model, "ml/build/url_model.joblib")
+    print("Saved: ml/build/url_model.joblib")
 
 if __name__ == "__main__":
     main()